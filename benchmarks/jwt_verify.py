@@ -0,0 +1,62 @@
+"""
+Micro-benchmark: cost of verifying one RS256 access token.
+
+Compares the old per-request path (JWK -> PEM -> jwt.decode parsing the
+PEM again) with handing a pre-parsed public key from the key registry
+straight to jwt.decode.
+
+    python benchmarks/jwt_verify.py [iterations]
+"""
+
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sms_service.settings')
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from sms_service.auth import jwk_to_pem
+from sms_service.jwks import build_key_registry
+
+AUDIENCE = 'https://bench.example.com/api/'
+ISSUER = 'https://bench.example.com/'
+
+
+def int_to_base64(value):
+    return jwt.utils.base64url_encode(value.to_bytes((value.bit_length() + 7) // 8, 'big')).decode()
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    numbers = private_key.public_key().public_numbers()
+    jwk = {'kid': 'bench', 'kty': 'RSA', 'n': int_to_base64(numbers.n), 'e': int_to_base64(numbers.e)}
+    token = jwt.encode(
+        {'aud': AUDIENCE, 'iss': ISSUER, 'sub': 'bench@clients', 'exp': int(time.time()) + 3600},
+        private_key,
+        algorithm='RS256',
+        headers={'kid': 'bench'},
+    )
+
+    def decode(key):
+        jwt.decode(token, key, algorithms=['RS256'], audience=AUDIENCE, issuer=ISSUER)
+
+    registry = build_key_registry({'keys': [jwk]})
+
+    results = {
+        'jwk_to_pem per request': lambda: decode(jwk_to_pem(jwk)),
+        'pre-parsed key registry': lambda: decode(registry['bench']),
+    }
+
+    for name, func in results.items():
+        seconds = min(timeit.repeat(func, number=iterations, repeat=3))
+        print(f"{name:<26} {seconds / iterations * 1e6:8.1f} us/token")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Query plans and timings for the filtered order queries.
+
+Seeds the configured database with --rows orders spread over --customers
+customers and the last year, then prints EXPLAIN output and the time
+taken for the queries behind GET /api/orders/ filters. Run it against a
+scratch database:
+
+    python benchmarks/order_queries.py [--rows 1000000] [--customers 10000] [--skip-seed]
+
+On PostgreSQL the rows are generated in SQL with generate_series and
+plans come from EXPLAIN ANALYZE; look for Index Scan / Bitmap Index Scan
+on orders_order's (customer_id, order_time) and (order_time, id) indexes.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sms_service.settings')
+
+import django
+
+django.setup()
+
+from django.db import connection, transaction
+from django.http import QueryDict
+from django.utils import timezone
+
+from customers.models import Customer
+from orders.filters import filter_orders
+from orders.models import Order
+from orders.pagination import after_cursor, keyset_page
+
+
+def seed_customers(count):
+    existing = Customer.objects.filter(code__startswith='BENCH').count()
+    Customer.objects.bulk_create(
+        [
+            Customer(name=f"Bench {i}", code=f"BENCH{i}", phone=f"07{i % 10 ** 8:08d}", email=f"bench{i}@example.com")
+            for i in range(existing, count)
+        ],
+        batch_size=5000,
+    )
+    return list(Customer.objects.filter(code__startswith='BENCH').values_list('id', flat=True))
+
+
+def seed_orders(rows, customer_ids):
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO orders_order (customer_id, item, amount, order_time, last_modified)
+                SELECT (%s::bigint[])[1 + floor(random() * %s)::int],
+                       'Bench item ' || n,
+                       round((random() * 10000)::numeric, 2),
+                       now() - random() * interval '365 days',
+                       now()
+                FROM generate_series(1, %s) AS n
+                """,
+                [customer_ids, len(customer_ids), rows],
+            )
+            cursor.execute("ANALYZE orders_order")
+        return
+
+    now = timezone.now()
+    batch = []
+    for n in range(rows):
+        batch.append(Order(
+            customer_id=random.choice(customer_ids),
+            item=f"Bench item {n}",
+            amount=Decimal(random.randint(1, 1000000)) / 100,
+        ))
+        if len(batch) == 10000:
+            Order.objects.bulk_create(batch)
+            batch = []
+    Order.objects.bulk_create(batch)
+    # order_time is auto_now_add, so spread it over the year afterwards
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "UPDATE orders_order SET order_time = datetime(%s, '-' || (abs(random()) %% 31536000) || ' seconds')",
+            [now.strftime('%Y-%m-%d %H:%M:%S')],
+        )
+
+
+def explain(queryset):
+    if connection.vendor == 'postgresql':
+        return queryset.explain(analyze=True, buffers=True)
+    return queryset.explain()
+
+
+def run(label, queryset):
+    started = time.perf_counter()
+    rows = len(list(queryset))
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"== {label}: {rows} rows in {elapsed:.1f}ms")
+    print(explain(queryset))
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--customers', type=int, default=10000)
+    parser.add_argument('--skip-seed', action='store_true')
+    args = parser.parse_args()
+
+    customer_ids = seed_customers(args.customers)
+    if not args.skip_seed:
+        started = time.monotonic()
+        with transaction.atomic():
+            seed_orders(args.rows, customer_ids)
+        print(f"seeded {args.rows} orders in {time.monotonic() - started:.1f}s\n")
+
+    week_ago = (timezone.now() - timedelta(days=7)).isoformat()
+    orders = Order.objects.values('id', 'customer_id', 'customer__name', 'item', 'amount', 'order_time')
+
+    def filtered(**params):
+        query = QueryDict(mutable=True)
+        query.update(params)
+        return filter_orders(orders, query).order_by('order_time', 'id')[:100]
+
+    run("customer, last week", filtered(customer_id=str(customer_ids[0]), start=week_ago))
+    run("one day", filtered(start=(timezone.now() - timedelta(days=30)).date().isoformat(),
+                            end=(timezone.now() - timedelta(days=30)).date().isoformat()))
+    run("amount range, last week", filtered(start=week_ago, min_amount='100', max_amount='200'))
+
+    _, cursor = keyset_page(orders, None, 100)
+    for _ in range(50):
+        _, cursor = keyset_page(orders, cursor, 100)
+    run("order_list page 52", after_cursor(orders, cursor)[:101])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Micro-benchmark: per-row cost of serializing orders for a response.
+
+Compares the old view path (model instances -> hand-built dicts with
+str(amount) and isoformat() -> DRF's JSONRenderer) with RowSerializer
+(values_list tuples zipped into dicts -> ORJSONRenderer). Rows are built
+in memory so only serialization is measured, not the database.
+
+    python benchmarks/serialization.py [rows]
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sms_service.settings')
+
+import django
+
+django.setup()
+
+from rest_framework.renderers import JSONRenderer
+
+from customers.models import Customer
+from orders.models import Order
+from orders.serializers import order_serializer
+from sms_service.renderers import ORJSONRenderer
+
+
+def make_rows(count):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        (i, i % 1000, f"Customer {i % 1000}", f"Item {i}", Decimal(i % 100000) / 100, start + timedelta(seconds=i))
+        for i in range(count)
+    ]
+
+
+def make_instances(rows):
+    customers = {}
+    orders = []
+    for order_id, customer_id, customer_name, item, amount, order_time in rows:
+        customer = customers.get(customer_id)
+        if customer is None:
+            customer = customers[customer_id] = Customer(id=customer_id, name=customer_name)
+        orders.append(Order(id=order_id, customer=customer, item=item, amount=amount, order_time=order_time))
+    return orders
+
+
+def old_path(orders):
+    data = []
+    for order in orders:
+        data.append({
+            'id': order.id,
+            'customer_id': order.customer.id,
+            'customer_name': order.customer.name,
+            'item': order.item,
+            'amount': str(order.amount),
+            'order_time': order.order_time.isoformat()
+        })
+    return JSONRenderer().render(data)
+
+
+def new_path(rows):
+    names = order_serializer.names
+    return ORJSONRenderer().render([dict(zip(names, row)) for row in rows])
+
+
+def measure(label, func, arg, count):
+    best = None
+    for _ in range(3):
+        started = time.perf_counter()
+        body = func(arg)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<32} {best * 1000:8.1f}ms  {best / count * 1e6:6.2f}us/row  {len(body) / 1e6:.1f}MB")
+    return body
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rows = make_rows(count)
+    orders = make_instances(rows)
+
+    old = measure("instances + JSONRenderer", old_path, orders, count)
+    new = measure("values_list + ORJSONRenderer", new_path, rows, count)
+    # Same document either way
+    assert json.loads(old) == json.loads(new)
+
+
+if __name__ == '__main__':
+    main()
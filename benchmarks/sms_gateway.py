@@ -0,0 +1,73 @@
+"""
+Load test: push messages through the SMS backend against the fake gateway.
+
+Starts the fake Africa's Talking gateway in-process and sends messages
+through HTTPBackend with the dispatcher's worker pool and token bucket,
+so the numbers include real HTTP and connection-pool costs.
+
+    python benchmarks/sms_gateway.py [--messages 2000] [--workers 16]
+        [--rate 0] [--latency 0.05] [--error-rate 0.0]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sms_service.settings')
+
+import django
+
+django.setup()
+
+from django.conf import settings
+
+from orders.dispatcher import TokenBucket
+from orders.fake_gateway import make_server
+from orders.sms import send_sms
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--rate', type=float, default=0, help="Messages per second, 0 for unlimited")
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = make_server(port=0, latency=args.latency, error_rate=args.error_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings.SMS_BACKEND = 'orders.sms_backends.HTTPBackend'
+    settings.SMS_HTTP_GATEWAY_URL = f"http://127.0.0.1:{server.server_address[1]}/version1/messaging"
+    settings.SMS_DISPATCH_WORKERS = args.workers
+
+    bucket = TokenBucket(args.rate, max(args.workers, 1))
+    failures = 0
+
+    def send(i):
+        bucket.acquire()
+        try:
+            send_sms(f"+2547{i:08d}", "Benchmark message")
+        except Exception:
+            return False
+        return True
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        for ok in executor.map(send, range(args.messages)):
+            failures += not ok
+    elapsed = time.monotonic() - started
+    server.shutdown()
+
+    print(f"messages   {args.messages}")
+    print(f"failures   {failures}")
+    print(f"elapsed    {elapsed:.2f}s")
+    print(f"throughput {args.messages / elapsed * 60:.0f}/min")
+
+
+if __name__ == '__main__':
+    main()
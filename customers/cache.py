@@ -0,0 +1,25 @@
+from sms_service import object_cache
+from sms_service.etags import make_etag
+from sms_service.serialization import RowSerializer
+
+from .models import Customer
+
+
+cached_customer_serializer = RowSerializer(
+    id='id', name='name', code='code', phone='phone', email='email', last_modified='last_modified'
+)
+
+
+def load_customer(pk):
+    return cached_customer_serializer.one(Customer.objects.filter(pk=pk))
+
+
+customer_cache = object_cache.register('customer', load_customer)
+
+
+def customer_detail_etag(request, pk):
+    """ETag of customer_detail, from the cache entry's last_modified, so a 304 costs no query."""
+    customer = customer_cache.get(pk)
+    if customer is None:
+        return None
+    return make_etag('customer', pk, customer['last_modified'])
@@ -0,0 +1,43 @@
+from django.db import migrations, models
+
+from customers.phone import to_e164
+
+BATCH_SIZE = 1000
+
+
+def backfill_phone_e164(apps, schema_editor):
+    Customer = apps.get_model('customers', 'Customer')
+    last_id = 0
+    while True:
+        batch = list(Customer.objects.filter(id__gt=last_id).order_by('id').only('id', 'phone')[:BATCH_SIZE])
+        if not batch:
+            break
+        for customer in batch:
+            customer.phone_e164 = to_e164(customer.phone)
+        Customer.objects.bulk_update(batch, ['phone_e164'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    # Commit each backfill batch on its own instead of holding one long transaction
+    atomic = False
+
+    dependencies = [
+        ('customers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='phone_e164',
+            field=models.CharField(blank=True, max_length=16),
+        ),
+        migrations.RunPython(backfill_phone_e164, migrations.RunPython.noop),
+        # Index once the column is filled rather than maintaining it row by row
+        migrations.AlterField(
+            model_name='customer',
+            name='phone_e164',
+            field=models.CharField(blank=True, db_index=True, max_length=16),
+        ),
+    ]
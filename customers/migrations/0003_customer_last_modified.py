@@ -0,0 +1,18 @@
+# Generated by Django 4.2.10 on 2026-10-18 01:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_customer_phone_e164'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='last_modified',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
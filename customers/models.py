@@ -1,10 +1,23 @@
 from django.db import models
+from .phone import to_e164
 
 class Customer(models.Model):
     name = models.CharField(max_length=100)
     code = models.CharField(max_length=20, unique=True)
     phone = models.CharField(max_length=20)
+    # Normalized copy of phone, kept in sync on save; use it for sending and lookups
+    phone_e164 = models.CharField(max_length=16, blank=True, db_index=True)
     email = models.EmailField(unique=True)
+    # Drives the ETags of the customer endpoints
+    last_modified = models.DateTimeField(auto_now=True, db_index=True)
+    
+    def save(self, *args, **kwargs):
+        self.phone_e164 = to_e164(self.phone)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            extra = {'last_modified', 'phone_e164'} if 'phone' in update_fields else {'last_modified'}
+            kwargs['update_fields'] = set(update_fields) | extra
+        super().save(*args, **kwargs)
     
     def __str__(self):
         return self.name
\ No newline at end of file
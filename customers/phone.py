@@ -0,0 +1,34 @@
+import re
+
+from django.conf import settings
+
+NON_DIGITS = re.compile(r'\D')
+
+
+def to_e164(phone, country_code=None):
+    """
+    Normalize a phone number to E.164 (e.g. '0712 345-678' -> '+254712345678').
+
+    Numbers without an international prefix are taken to be local to
+    PHONE_DEFAULT_COUNTRY_CODE. Returns '' when the input cannot be a
+    valid number.
+    """
+    if not phone:
+        return ''
+    country_code = country_code or settings.PHONE_DEFAULT_COUNTRY_CODE
+
+    phone = phone.strip()
+    international = phone.startswith('+') or phone.startswith('00')
+    digits = NON_DIGITS.sub('', phone)
+
+    if international:
+        if phone.startswith('00'):
+            digits = digits[2:]
+    elif digits.startswith(country_code) and len(digits) > 10:
+        pass
+    else:
+        digits = country_code + digits.lstrip('0')
+
+    if not 8 <= len(digits) <= 15:
+        return ''
+    return f"+{digits}"
@@ -0,0 +1,3 @@
+from sms_service.serialization import RowSerializer
+
+customer_serializer = RowSerializer(id='id', name='name', code='code', phone='phone', email='email')
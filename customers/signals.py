@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from sms_service.etags import bump_table_version
+
+from .cache import customer_cache
+from .models import Customer
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_delete, sender=Customer)
+def invalidate_customer_cache(sender, instance, **kwargs):
+    customer_cache.invalidate(instance.pk)
+    bump_table_version('customers')
@@ -3,6 +3,7 @@ from django.urls import reverse
 import json
 from .models import Customer
 import os
+from unittest.mock import patch
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -105,6 +106,29 @@ class CustomerTests(TestCase):
         updated_customer = Customer.objects.get(id=self.customer.id)
         self.assertEqual(updated_customer.name, 'Updated Customer')
         self.assertEqual(updated_customer.email, 'updated@example.com')
+
+    def test_patch_customer(self):
+        response = self.client.patch(
+            reverse('customer-update', args=[self.customer.id]),
+            data=json.dumps({"phone": "0799 887-766"}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {self.token}'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'id': self.customer.id, 'phone': '0799 887-766'})
+        self.assertEqual(Customer.objects.get(id=self.customer.id).phone_e164, '+254799887766')
+
+    def test_update_customer_duplicate_email(self):
+        other = Customer.objects.create(name="Other", code="OTHER1", phone="0700000000", email="other@example.com")
+        response = self.client.patch(
+            reverse('customer-update', args=[other.id]),
+            data=json.dumps({"email": self.customer.email}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {self.token}'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('already exists', response.json()['error'])
+        self.assertEqual(Customer.objects.get(id=other.id).email, "other@example.com")
         
     def test_delete_customer(self):
         response = self.client.delete(
@@ -112,4 +136,110 @@ class CustomerTests(TestCase):
             HTTP_AUTHORIZATION=f'Bearer {self.token}'
         )
         self.assertEqual(response.status_code, 204)
-        self.assertEqual(Customer.objects.count(), 0)
\ No newline at end of file
+        self.assertEqual(Customer.objects.count(), 0)
+
+class PhoneNormalizationTests(TestCase):
+    def setUp(self):
+        self.token = os.environ.get('ACCESS_TOKEN', '')
+
+    def test_to_e164(self):
+        from .phone import to_e164
+
+        self.assertEqual(to_e164('0712345678'), '+254712345678')
+        self.assertEqual(to_e164('0712 345-678'), '+254712345678')
+        self.assertEqual(to_e164('712345678'), '+254712345678')
+        self.assertEqual(to_e164('254712345678'), '+254712345678')
+        self.assertEqual(to_e164('+254 712 345 678'), '+254712345678')
+        self.assertEqual(to_e164('00447911123456'), '+447911123456')
+        self.assertEqual(to_e164('12'), '')
+        self.assertEqual(to_e164(''), '')
+
+    def test_phone_e164_kept_in_sync(self):
+        customer = Customer.objects.create(
+            name="Test Customer", code="TEST123", phone="0712345678", email="test@example.com"
+        )
+        self.assertEqual(customer.phone_e164, '+254712345678')
+
+        customer.phone = "0799887766"
+        customer.save(update_fields=['phone'])
+        customer.refresh_from_db()
+        self.assertEqual(customer.phone_e164, '+254799887766')
+
+    def test_backfill_migration(self):
+        import importlib
+        from django.apps import apps
+
+        migration = importlib.import_module('customers.migrations.0002_customer_phone_e164')
+        Customer.objects.bulk_create([
+            Customer(name=f"Customer {i}", code=f"C{i}", phone=f"07{i:08d}", email=f"c{i}@example.com")
+            for i in range(3)
+        ])
+
+        with patch.object(migration, 'BATCH_SIZE', 2):
+            migration.backfill_phone_e164(apps, None)
+
+        self.assertEqual(
+            sorted(Customer.objects.values_list('phone_e164', flat=True)),
+            ['+254700000000', '+254700000001', '+254700000002'],
+        )
+
+    def test_lookup_by_phone(self):
+        customer = Customer.objects.create(
+            name="Test Customer", code="TEST123", phone="0712345678", email="test@example.com"
+        )
+
+        response = self.client.get(
+            reverse('customer-lookup'), {'phone': '+254 712 345678'},
+            HTTP_AUTHORIZATION=f'Bearer {self.token}'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.json()], [customer.id])
+
+        response = self.client.get(reverse('customer-lookup'), {'phone': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+
+class CustomerCacheTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.client = Client()
+        self.customer = Customer.objects.create(name="Cached", code="CACHE1", phone="0712345678", email="c@example.com")
+        self.token = os.environ.get('ACCESS_TOKEN', '')
+
+    def detail(self):
+        return self.client.get(reverse('customer-detail', args=[self.customer.id]), HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def test_detail_is_served_from_cache(self):
+        self.assertEqual(self.detail().json()['name'], "Cached")
+        with self.assertNumQueries(0):
+            response = self.detail()
+        self.assertEqual(response.json()['email'], "c@example.com")
+
+    def test_update_and_delete_invalidate(self):
+        self.detail()
+        self.client.put(
+            reverse('customer-update', args=[self.customer.id]),
+            data=json.dumps({'name': "Renamed"}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {self.token}'
+        )
+        self.assertEqual(self.detail().json()['name'], "Renamed")
+
+        self.client.delete(reverse('customer-delete', args=[self.customer.id]), HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(self.detail().status_code, 404)
+
+    def test_stats_endpoint(self):
+        from customers.cache import customer_cache
+
+        before = customer_cache.stats()
+        self.detail()
+        self.detail()
+
+        response = self.client.get(reverse('cache-stats'), HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        stats = response.json()['customer']
+        # The ETag check and the view each read the entry
+        self.assertEqual(stats['hits'], before['hits'] + 3)
+        self.assertEqual(stats['misses'], before['misses'] + 1)
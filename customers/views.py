@@ -1,15 +1,25 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from django.contrib.auth.decorators import login_required
 from .models import Customer
+from .cache import customer_cache, customer_detail_etag
+from .serializers import customer_serializer
+from .phone import to_e164
 import json
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition
+from sms_service.etags import bump_table_version, make_etag, table_version
 from sms_service.auth import requires_auth
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
+def customer_list_etag(request):
+    return make_etag('customers', table_version('customers'))
+
 @swagger_auto_schema(
     method='get',
     operation_description="Get a list of all customers",
@@ -35,18 +45,46 @@ from rest_framework.response import Response
 )
 @api_view(['GET'])
 @requires_auth
+@condition(etag_func=customer_list_etag)
 def customer_list(request):
-    customers = Customer.objects.all()
-    data = []
-    for customer in customers:
-        data.append({
-            'id': customer.id,
-            'name': customer.name,
-            'code': customer.code,
-            'phone': customer.phone,
-            'email': customer.email
-        })
-    return Response(data)
+    return Response(customer_serializer.rows(Customer.objects.all()))
+
+@swagger_auto_schema(
+    method='get',
+    operation_description="Find customers by phone number, in any common format",
+    manual_parameters=[
+        openapi.Parameter('phone', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True,
+                          description="Phone number, e.g. 0712345678 or +254712345678"),
+    ],
+    responses={
+        200: openapi.Response(
+            description="Successful operation",
+            schema=openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'name': openapi.Schema(type=openapi.TYPE_STRING),
+                        'code': openapi.Schema(type=openapi.TYPE_STRING),
+                        'phone': openapi.Schema(type=openapi.TYPE_STRING),
+                        'email': openapi.Schema(type=openapi.TYPE_STRING),
+                    }
+                )
+            )
+        ),
+        400: openapi.Response(description="Missing or invalid phone number"),
+        401: openapi.Response(description="Unauthorized")
+    }
+)
+@api_view(['GET'])
+@requires_auth
+def customer_lookup(request):
+    phone = to_e164(request.GET.get('phone', ''))
+    if not phone:
+        return Response({'error': 'A valid phone number is required'}, status=400)
+    
+    return Response(customer_serializer.rows(Customer.objects.filter(phone_e164=phone)))
 
 @swagger_auto_schema(
     method='get',
@@ -70,16 +108,12 @@ def customer_list(request):
 )
 @api_view(['GET'])
 @requires_auth
+@condition(etag_func=customer_detail_etag)
 def customer_detail(request, pk):
-    customer = get_object_or_404(Customer, pk=pk)
-    data = {
-        'id': customer.id,
-        'name': customer.name,
-        'code': customer.code,
-        'phone': customer.phone,
-        'email': customer.email
-    }
-    return Response(data)
+    customer = customer_cache.get(pk)
+    if customer is None:
+        raise Http404("No Customer matches the given query.")
+    return Response({name: customer[name] for name in customer_serializer.names})
 
 @swagger_auto_schema(
     method='post',
@@ -137,17 +171,11 @@ def customer_create(request):
             email=email
         )
         
-        return Response({
-            'id': customer.id,
-            'name': customer.name,
-            'code': customer.code,
-            'phone': customer.phone,
-            'email': customer.email
-        }, status=201)
+        return Response(customer_serializer.instance(customer), status=201)
 
 @swagger_auto_schema(
-    method='put',
-    operation_description="Update an existing customer",
+    methods=['put', 'patch'],
+    operation_description="Update an existing customer. PUT responds with the full customer; PATCH responds with the id and the fields that changed",
     request_body=openapi.Schema(
         type=openapi.TYPE_OBJECT,
         properties={
@@ -169,41 +197,46 @@ def customer_create(request):
                     'email': openapi.Schema(type=openapi.TYPE_STRING),
                 }
             )
-        )
+        ),
+        400: openapi.Response(description="Email already in use"),
+        404: openapi.Response(description="Customer not found"),
     }
 )
-@api_view(['PUT'])
+@api_view(['PUT', 'PATCH'])
 @requires_auth
 def customer_update(request, pk):
-    customer = get_object_or_404(Customer, pk=pk)
-    
-    if request.method == 'PUT':
-        data = request.data
-        
-        name = data.get('name')
-        phone = data.get('phone')
-        email = data.get('email')
-        
-        if name:
-            customer.name = name
-        
-        if phone:
-            customer.phone = phone
-            
-        if email:
-            if Customer.objects.exclude(id=customer.id).filter(email=email).exists():
-                return Response({'error': f"Customer with email '{email}' already exists"}, status=400)
-            customer.email = email
-        
-        customer.save()
-        
-        return Response({
-            'id': customer.id,
-            'name': customer.name,
-            'code': customer.code,
-            'phone': customer.phone,
-            'email': customer.email
-        })
+    data = request.data
+    changes = {}
+
+    for field in ('name', 'phone', 'email'):
+        if data.get(field):
+            changes[field] = data[field]
+
+    if changes:
+        # One UPDATE of just the changed columns; the unique index on
+        # email catches duplicates instead of a lookup beforehand
+        fields = dict(changes, last_modified=timezone.now())
+        if 'phone' in changes:
+            fields['phone_e164'] = to_e164(changes['phone'])
+        try:
+            with transaction.atomic():
+                updated = Customer.objects.filter(pk=pk).update(**fields)
+        except IntegrityError:
+            return Response({'error': f"Customer with email '{changes['email']}' already exists"}, status=400)
+        if not updated:
+            raise Http404('Customer not found')
+        customer_cache.invalidate(pk)
+        bump_table_version('customers')
+
+    if request.method == 'PATCH':
+        if not changes and not Customer.objects.filter(pk=pk).exists():
+            raise Http404('Customer not found')
+        return Response({'id': pk, **changes})
+
+    customer = customer_serializer.one(Customer.objects.filter(pk=pk))
+    if customer is None:
+        raise Http404('Customer not found')
+    return Response(customer)
 
 @swagger_auto_schema(
     method='delete',
@@ -0,0 +1,93 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils import timezone
+
+from customers.models import Customer
+from .circuit_breaker import CircuitOpenError
+from .dispatcher import TokenBucket
+from .models import Broadcast
+from . import sms
+
+
+def render_message(template, name):
+    # Plain replace rather than str.format, which would evaluate
+    # arbitrary {fields} in operator-supplied text
+    return template.replace('{name}', name)
+
+
+def _chunks(queryset, chunk_size):
+    chunk = []
+    for row in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_broadcast(broadcast, chunk_size=None, recipients_per_call=None, progress=None):
+    """
+    Send broadcast.message to every customer not handled yet.
+
+    Customers are streamed in id order through a server-side cursor and
+    processed chunk_size at a time. Customers whose rendered message is
+    identical share one multi-recipient gateway call. Progress is saved
+    after every gateway call: the customers it covered are recorded in
+    done_customer_ids, and once a chunk is finished last_customer_id moves
+    past it. A crash or an open circuit therefore never re-sends to a
+    customer whose call succeeded when the broadcast is resumed.
+
+    progress, if given, is called with the broadcast after each chunk.
+    """
+    chunk_size = chunk_size or settings.SMS_BROADCAST_CHUNK_SIZE
+    recipients_per_call = recipients_per_call or settings.SMS_BROADCAST_RECIPIENTS_PER_CALL
+    bucket = TokenBucket(settings.SMS_DISPATCH_RATE, settings.SMS_DISPATCH_BURST)
+
+    customers = Customer.objects.exclude(phone_e164='').order_by('id').values_list('id', 'name', 'phone_e164')
+    if broadcast.total_recipients == 0:
+        broadcast.total_recipients = customers.count()
+    broadcast.status = Broadcast.RUNNING
+    broadcast.save(update_fields=['status', 'total_recipients', 'updated_at'])
+
+    done = set(broadcast.done_customer_ids)
+    remaining = customers.filter(id__gt=broadcast.last_customer_id)
+    for chunk in _chunks(remaining, chunk_size):
+        groups = defaultdict(list)
+        for customer_id, name, phone in chunk:
+            if customer_id not in done:
+                groups[render_message(broadcast.message, name)].append((customer_id, phone))
+
+        try:
+            for body, recipients in groups.items():
+                for start in range(0, len(recipients), recipients_per_call):
+                    batch = recipients[start:start + recipients_per_call]
+                    # The rate limit counts messages, not gateway calls
+                    bucket.acquire(len(batch))
+                    response = sms.send_bulk([phone for _, phone in batch], body)
+                    rejected = sms.rejected_recipients(response)
+                    sms.save_log(sms.log_entries(response))
+                    done.update(customer_id for customer_id, _ in batch)
+                    broadcast.done_customer_ids = sorted(done)
+                    broadcast.sent_count += len(batch) - len(rejected)
+                    broadcast.failed_count += len(rejected)
+                    broadcast.save(update_fields=['done_customer_ids', 'sent_count', 'failed_count', 'updated_at'])
+        except (CircuitOpenError, sms.SMSDeliveryError) as e:
+            broadcast.status = Broadcast.PAUSED
+            broadcast.last_error = str(e)
+            broadcast.save(update_fields=['status', 'last_error', 'updated_at'])
+            return broadcast
+
+        broadcast.last_customer_id = chunk[-1][0]
+        done = {customer_id for customer_id in done if customer_id > broadcast.last_customer_id}
+        broadcast.done_customer_ids = sorted(done)
+        broadcast.save(update_fields=['last_customer_id', 'done_customer_ids', 'updated_at'])
+        if progress:
+            progress(broadcast)
+
+    broadcast.status = Broadcast.COMPLETED
+    broadcast.last_error = ''
+    broadcast.completed_at = timezone.now()
+    broadcast.save(update_fields=['status', 'last_error', 'completed_at', 'updated_at'])
+    return broadcast
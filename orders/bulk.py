@@ -0,0 +1,117 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from sms_service.etags import bump_table_version
+
+from . import rollups
+from .cache import order_cache
+from .filters import FILTER_PARAMS, filter_orders
+from .models import Order
+
+
+def target_ids(data, limit=None):
+    """
+    The order ids a bulk request targets, from either an `ids` list or a
+    `filter` object taking the order list filters. A filter must set at
+    least one of them and nothing else.
+
+    At most `limit` (ORDER_BULK_WRITE_MAX_ITEMS) orders may be targeted;
+    a filter matching more is rejected rather than cut short, so the
+    caller never gets a silently partial result. Raises ValueError for
+    malformed or oversized requests.
+    """
+    limit = limit or settings.ORDER_BULK_WRITE_MAX_ITEMS
+    ids = data.get('ids')
+    params = data.get('filter')
+
+    if (ids is None) == (params is None):
+        raise ValueError("Provide either 'ids' or 'filter'")
+
+    if ids is not None:
+        if not isinstance(ids, list) or not ids:
+            raise ValueError("'ids' must be a non-empty list")
+        try:
+            ids = sorted({int(pk) for pk in ids})
+        except (TypeError, ValueError):
+            raise ValueError("'ids' must contain integers")
+        if len(ids) > limit:
+            raise ValueError(f"At most {limit} orders can be changed per request")
+        return ids
+
+    # filter_orders() skips unknown and empty parameters, which here would
+    # silently target every order
+    if not isinstance(params, dict):
+        raise ValueError("'filter' must be an object")
+    unknown = sorted(set(params) - set(FILTER_PARAMS))
+    if unknown:
+        raise ValueError(f"Unknown filter fields: {', '.join(unknown)}")
+    params = {name: str(value) for name, value in params.items() if value not in (None, '')}
+    if not params:
+        raise ValueError(f"'filter' must set at least one of: {', '.join(FILTER_PARAMS)}")
+    queryset = filter_orders(Order.objects.all(), params)
+    ids = list(queryset.order_by('id').values_list('id', flat=True)[:limit + 1])
+    if len(ids) > limit:
+        raise ValueError(f"Filter matches more than {limit} orders; narrow it down")
+    return ids
+
+
+def chunks(ids, size):
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+def _locked_keys(chunk):
+    """Lock the orders in chunk and return their rollup keys."""
+    rows = (
+        Order.objects.select_for_update()
+        .filter(id__in=chunk)
+        .values_list('order_time', 'customer_id', 'amount')
+    )
+    return [(timezone.localdate(order_time), customer_id, amount) for order_time, customer_id, amount in rows]
+
+
+def update_orders(ids, changes, chunk_size=None):
+    """
+    Write changes to the orders in ids and return how many were updated.
+
+    Each chunk of ORDER_BULK_BATCH_SIZE ids is one transaction with a
+    single UPDATE, so row locks are held for one chunk at a time. The
+    order signals do not fire for QuerySet.update(), so last_modified,
+    the revenue rollups and the detail cache are maintained here.
+    """
+    chunk_size = chunk_size or settings.ORDER_BULK_BATCH_SIZE
+    updated = 0
+    for chunk in chunks(ids, chunk_size):
+        with transaction.atomic():
+            if 'amount' in changes:
+                old = _locked_keys(chunk)
+                new = [(day, customer_id, changes['amount']) for day, customer_id, _ in old]
+            updated += Order.objects.filter(id__in=chunk).update(**changes, last_modified=timezone.now())
+            if 'amount' in changes:
+                rollups.move(old, new)
+            order_cache.invalidate(*chunk)
+            bump_table_version('orders')
+    return updated
+
+
+def delete_orders(ids, chunk_size=None):
+    """
+    Delete the orders in ids and return how many were deleted.
+
+    Each chunk is one transaction that locks its orders and deletes them
+    with QuerySet.delete(), so related rows are handled by the collector
+    as for any other delete. The post_delete handlers still drop cache
+    entries and bump the list version per order, but their rollup changes
+    are collected and applied in one grouped pass per chunk.
+    """
+    chunk_size = chunk_size or settings.ORDER_BULK_BATCH_SIZE
+    deleted = 0
+    for chunk in chunks(ids, chunk_size):
+        with transaction.atomic():
+            # Lock first, so the rollup keys the collector loads stay current
+            list(Order.objects.select_for_update().filter(id__in=chunk).values_list('id', flat=True))
+            with rollups.grouped():
+                _, counts = Order.objects.filter(id__in=chunk).delete()
+            deleted += counts.get(Order._meta.label, 0)
+    return deleted
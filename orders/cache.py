@@ -0,0 +1,54 @@
+from customers.cache import customer_cache
+from sms_service import object_cache
+from sms_service.etags import make_etag
+from sms_service.serialization import RowSerializer
+
+from .models import Order
+
+
+# The customer's name lives in the customer entry
+cached_order_serializer = RowSerializer(
+    id='id',
+    customer_id='customer_id',
+    item='item',
+    amount='amount',
+    order_time='order_time',
+    last_modified='last_modified',
+)
+
+
+def load_order(pk):
+    return cached_order_serializer.one(Order.objects.filter(pk=pk))
+
+
+order_cache = object_cache.register('order', load_order)
+
+
+def order_detail_payload(pk):
+    """
+    The order_detail response for pk, or None if there is no such order.
+
+    Orders and customers are cached separately, so renaming a customer
+    only invalidates one entry instead of one per order.
+    """
+    order = order_cache.get(pk)
+    if order is None:
+        return None
+    customer = customer_cache.get(order['customer_id'])
+    return {
+        'id': order['id'],
+        'customer_id': order['customer_id'],
+        'customer_name': customer['name'] if customer else None,
+        'item': order['item'],
+        'amount': order['amount'],
+        'order_time': order['order_time']
+    }
+
+
+def order_detail_etag(request, pk):
+    """ETag of order_detail, from the cache entries' last_modified, so a 304 costs no query."""
+    order = order_cache.get(pk)
+    if order is None:
+        return None
+    customer = customer_cache.get(order['customer_id'])
+    return make_etag('order', pk, order['last_modified'], customer['last_modified'] if customer else '')
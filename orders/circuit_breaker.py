@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the gateway while the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker around the SMS gateway.
+
+    Outcomes of the last SMS_BREAKER_WINDOW calls are kept. Once at least
+    SMS_BREAKER_MIN_CALLS are recorded and the failure rate reaches
+    SMS_BREAKER_FAILURE_RATE the circuit opens and calls fail fast. After
+    SMS_BREAKER_RESET_TIMEOUT seconds it goes half-open and lets
+    SMS_BREAKER_HALF_OPEN_CALLS probes through: a success closes it, a
+    failure opens it again.
+
+    State is per process.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._outcomes = deque()
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._probes = 0
+        self.rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == self.OPEN and time.time() - self._opened_at >= settings.SMS_BREAKER_RESET_TIMEOUT:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def call(self, func, *args, **kwargs):
+        self._before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self._record(False)
+            raise
+        self._record(True)
+        return result
+
+    def _before_call(self):
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and self._probes < settings.SMS_BREAKER_HALF_OPEN_CALLS:
+                self._probes += 1
+                return
+            self.rejected += 1
+        raise CircuitOpenError(f"Circuit '{self.name}' is open")
+
+    def _record(self, success):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                if success:
+                    self._close()
+                else:
+                    self._open()
+                return
+
+            self._outcomes.append(success)
+            while len(self._outcomes) > settings.SMS_BREAKER_WINDOW:
+                self._outcomes.popleft()
+
+            if self._state == self.CLOSED and len(self._outcomes) >= settings.SMS_BREAKER_MIN_CALLS:
+                if self._failure_rate() >= settings.SMS_BREAKER_FAILURE_RATE:
+                    self._open()
+
+    def _failure_rate(self):
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def _open(self):
+        self._state = self.OPEN
+        self._opened_at = time.time()
+        self._outcomes.clear()
+
+    def _close(self):
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._outcomes.clear()
+
+    def reset(self):
+        with self._lock:
+            self._close()
+            self.rejected = 0
+
+    def stats(self):
+        with self._lock:
+            state = self._current_state()
+            retry_in = None
+            if state == self.OPEN:
+                retry_in = max(settings.SMS_BREAKER_RESET_TIMEOUT - (time.time() - self._opened_at), 0)
+            return {
+                'name': self.name,
+                'state': state,
+                'failure_rate': self._failure_rate(),
+                'recent_calls': len(self._outcomes),
+                'rejected': self.rejected,
+                'retry_in': retry_in,
+            }
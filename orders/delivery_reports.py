@@ -0,0 +1,113 @@
+import atexit
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import SMSMessage
+
+# Africa's Talking final status for a message that reached the handset
+DELIVERED = 'Success'
+
+
+class DeliveryReportBuffer:
+    """
+    Collects delivery-report callbacks and writes them in batches.
+
+    Reports are kept per provider message id, so repeated callbacks for
+    one message cost a single row update. The buffer is flushed when it
+    holds SMS_DELIVERY_REPORT_BATCH_SIZE messages, by a background thread
+    every SMS_DELIVERY_REPORT_FLUSH_INTERVAL seconds, and at exit.
+    """
+
+    def __init__(self):
+        self._reports = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher_pid = None
+
+    def __len__(self):
+        return len(self._reports)
+
+    def add(self, report):
+        with self._lock:
+            self._reports[report['id']] = report
+            full = len(self._reports) >= settings.SMS_DELIVERY_REPORT_BATCH_SIZE
+        self._ensure_flusher()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write buffered reports; returns how many messages were updated or added."""
+        with self._flush_lock:
+            with self._lock:
+                reports, self._reports = self._reports, {}
+            if not reports:
+                return 0
+            try:
+                return self._write(reports)
+            except Exception:
+                # Put them back (newer callbacks win) so the next flush retries
+                with self._lock:
+                    reports.update(self._reports)
+                    self._reports = reports
+                raise
+
+    def _write(self, reports):
+        now = timezone.now()
+        existing = SMSMessage.objects.in_bulk(list(reports), field_name='provider_message_id')
+
+        updated = []
+        created = []
+        for message_id, report in reports.items():
+            message = existing.get(message_id)
+            if message is None:
+                # Report for a message we did not log (e.g. sent before the
+                # log existed); only kept when explicitly enabled
+                if not settings.SMS_DELIVERY_REPORT_STORE_UNKNOWN:
+                    continue
+                message = SMSMessage(provider_message_id=message_id, phone=report.get('phoneNumber', ''))
+                created.append(message)
+            else:
+                updated.append(message)
+
+            message.status = report.get('status', '')
+            message.network_code = report.get('networkCode', '') or ''
+            message.failure_reason = report.get('failureReason', '') or ''
+            message.updated_at = now
+            if message.status == DELIVERED:
+                message.delivered_at = now
+
+        fields = ['status', 'network_code', 'failure_reason', 'updated_at', 'delivered_at']
+        batch_size = settings.SMS_DELIVERY_REPORT_BATCH_SIZE
+        SMSMessage.objects.bulk_update(updated, fields, batch_size=batch_size)
+        SMSMessage.objects.bulk_create(created, batch_size=batch_size, ignore_conflicts=True)
+        return len(updated) + len(created)
+
+    def _ensure_flusher(self):
+        interval = settings.SMS_DELIVERY_REPORT_FLUSH_INTERVAL
+        if interval <= 0 or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid != os.getpid():
+                self._flusher_pid = os.getpid()
+                threading.Thread(
+                    target=self._flush_loop, args=(interval,), name='sms-delivery-reports', daemon=True
+                ).start()
+
+    def _flush_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error writing delivery reports: {str(e)}")
+            finally:
+                close_old_connections()
+
+
+buffer = DeliveryReportBuffer()
+atexit.register(lambda: buffer.flush() if len(buffer) else None)
@@ -0,0 +1,115 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutboxMessage
+from .outbox import claim_batch, record_result, save_results
+from . import sms
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `capacity` banked."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """
+        Block until `tokens` are available, then take them.
+
+        A request larger than the bucket waits for a full bucket and leaves
+        it in debt, so later callers wait until the average rate is back
+        under `rate`.
+        """
+        if self.rate <= 0:
+            return
+        needed = min(tokens, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= needed:
+                    self._tokens -= tokens
+                    return
+                wait = (needed - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class Dispatcher:
+    """
+    Drains the SMS outbox with a pool of sender threads.
+
+    Batches are claimed and saved on the calling thread, so only the
+    gateway calls run concurrently. Every send first takes a token from a
+    bucket shared by the pool, which keeps the process under the account's
+    rate limit (SMS_DISPATCH_RATE messages per second).
+    """
+
+    def __init__(self, send=None, workers=None, rate=None, burst=None, batch_size=None):
+        self.send = send or sms.send_sms
+        self.workers = workers or settings.SMS_DISPATCH_WORKERS
+        self.batch_size = batch_size or settings.SMS_OUTBOX_BATCH_SIZE
+        rate = settings.SMS_DISPATCH_RATE if rate is None else rate
+        self.bucket = TokenBucket(rate, burst or settings.SMS_DISPATCH_BURST)
+        self.sent = 0
+        self.failed = 0
+        self.started_at = time.monotonic()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='sms-dispatch')
+
+    def _send_one(self, message):
+        self.bucket.acquire()
+        try:
+            return self.send(message.phone, message.message), None
+        except Exception as e:
+            return None, e
+
+    def run_once(self):
+        """Send one batch of due messages. Returns how many were attempted."""
+        messages = claim_batch(self.batch_size)
+        if not messages:
+            return 0
+
+        results = self._executor.map(self._send_one, messages)
+        log = []
+        for message, (response, error) in zip(messages, results):
+            record_result(message, error)
+            if error is None:
+                self.sent += 1
+                log.extend(sms.log_entries(response, outbox_message=message))
+            else:
+                self.failed += 1
+        save_results(messages)
+        sms.save_log(log)
+        return len(messages)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+    @staticmethod
+    def queue_depth():
+        """Messages that are due or waiting for a retry."""
+        return OutboxMessage.objects.filter(
+            Q(status=OutboxMessage.PENDING) | Q(status=OutboxMessage.SENDING)
+        ).count()
+
+    def stats(self):
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            'sent': self.sent,
+            'failed': self.failed,
+            'elapsed': elapsed,
+            'throughput_per_minute': (self.sent + self.failed) / elapsed * 60,
+            'queue_depth': self.queue_depth(),
+            'due': OutboxMessage.objects.filter(
+                status=OutboxMessage.PENDING, next_attempt_at__lte=timezone.now()
+            ).count(),
+        }
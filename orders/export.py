@@ -0,0 +1,83 @@
+import csv
+import zlib
+
+from django.conf import settings
+
+from sms_service import serialization
+
+from .serializers import order_serializer
+
+COLUMNS = order_serializer.names
+
+# Rows are joined into chunks of roughly this size before being sent
+CHUNK_BYTES = 64 * 1024
+
+
+class _Line:
+    """File-like object for csv.writer that hands back what it was given."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset):
+    """
+    Yield export rows as tuples in COLUMNS order.
+
+    Uses iterator() so rows are streamed from a server-side cursor in
+    batches of ORDER_EXPORT_CHUNK_SIZE instead of loaded all at once.
+    """
+    rows = order_serializer.values_list(queryset.order_by('id'))
+    return rows.iterator(chunk_size=settings.ORDER_EXPORT_CHUNK_SIZE)
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield serialization.dumps(dict(zip(COLUMNS, row))) + b'\n'
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Line())
+    yield writer.writerow(COLUMNS).encode()
+    for order_id, customer_id, customer_name, item, amount, order_time in rows:
+        yield writer.writerow([order_id, customer_id, customer_name, item, amount, order_time.isoformat()]).encode()
+
+
+def chunked(lines):
+    """Join lines into byte chunks of about CHUNK_BYTES."""
+    buffer = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzipped(chunks):
+    """Compress a stream of byte chunks into a single gzip stream."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson', ndjson_lines),
+    'csv': ('text/csv', 'csv', csv_lines),
+}
+
+
+def export_stream(queryset, output='ndjson', compress=False):
+    """Return (content type, file extension, byte iterator) for an export."""
+    content_type, extension, encode = FORMATS[output]
+    stream = chunked(encode(export_rows(queryset)))
+    if compress:
+        stream = gzipped(stream)
+    return content_type, extension, stream
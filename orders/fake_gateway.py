@@ -0,0 +1,73 @@
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from .sms_backends import success_response
+
+
+class FakeGatewayHandler(BaseHTTPRequestHandler):
+    """Answers like the Africa's Talking messaging API, after a delay."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        form = parse_qs(self.rfile.read(length).decode())
+        recipients = [number for number in form.get('to', [''])[0].split(',') if number]
+        message = form.get('message', [''])[0]
+
+        server = self.server
+        latency = server.latency
+        if server.jitter:
+            latency += random.uniform(0, server.jitter)
+        time.sleep(latency)
+
+        with server.lock:
+            server.requests += 1
+            failed = random.random() < server.error_rate
+            if failed:
+                server.errors += 1
+            else:
+                server.messages += len(recipients)
+
+        if failed:
+            self._respond(500, {'error': 'Simulated gateway failure'})
+        else:
+            self._respond(201, success_response(message, recipients))
+
+    def _respond(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        if self.server.verbose:
+            super().log_message(*args)
+
+
+def make_server(host='127.0.0.1', port=8025, latency=0.0, jitter=0.0, error_rate=0.0, verbose=False):
+    """
+    Build a fake gateway server; call serve_forever() to run it.
+
+    latency and jitter are in seconds, error_rate is the fraction of
+    requests answered with HTTP 500. Request and message counters are
+    kept on the server object.
+    """
+    import threading
+
+    server = ThreadingHTTPServer((host, port), FakeGatewayHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.jitter = jitter
+    server.error_rate = error_rate
+    server.verbose = verbose
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.errors = 0
+    server.messages = 0
+    return server
@@ -0,0 +1,72 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+# The parameters filter_orders() understands
+FILTER_PARAMS = ('customer_id', 'start', 'end', 'min_amount', 'max_amount')
+
+
+def parse_time(value, end=False):
+    """
+    Parse an ISO date or datetime query parameter.
+
+    A bare date means the start of that day, or the start of the next
+    day when it is the end of a range, so ?end=2024-01-31 includes the
+    31st. Naive values are taken to be in the current time zone.
+    """
+    day = parse_date(value)
+    if day is not None:
+        parsed = datetime.combine(day, time.min)
+        if end:
+            parsed += timedelta(days=1)
+    else:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValueError(f"Invalid date: {value}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_decimal(value, name):
+    try:
+        return Decimal(value.replace(',', ''))
+    except InvalidOperation:
+        raise ValueError(f"{name} must be a valid number")
+
+
+def filter_orders(queryset, params):
+    """
+    Apply the order filters in `params` (a QueryDict) to `queryset`.
+
+    customer_id matches one customer, start/end bound order_time (start
+    inclusive, end exclusive) and min_amount/max_amount bound amount
+    (both inclusive). Customer and time filters are served by the
+    (customer, order_time) and (order_time, id) indexes. Raises
+    ValueError for malformed values.
+    """
+    customer_id = params.get('customer_id')
+    start = params.get('start')
+    end = params.get('end')
+    min_amount = params.get('min_amount')
+    max_amount = params.get('max_amount')
+
+    if customer_id:
+        try:
+            queryset = queryset.filter(customer_id=int(customer_id))
+        except ValueError:
+            raise ValueError('customer_id must be an integer')
+    try:
+        if start:
+            queryset = queryset.filter(order_time__gte=parse_time(start))
+        if end:
+            queryset = queryset.filter(order_time__lt=parse_time(end, end=True))
+    except (ValueError, OverflowError) as e:
+        raise ValueError(str(e))
+    if min_amount:
+        queryset = queryset.filter(amount__gte=parse_decimal(min_amount, 'min_amount'))
+    if max_amount:
+        queryset = queryset.filter(amount__lte=parse_decimal(max_amount, 'max_amount'))
+    return queryset
@@ -0,0 +1,91 @@
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.response import Response
+
+from sms_service import serialization
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+
+
+def request_hash(request):
+    """Fingerprint of the request body, so a key cannot be reused for a different request."""
+    body = json.dumps(dict(request.data.items()), sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.path}\n{body}".encode()).hexdigest()
+
+
+def expiry_cutoff():
+    return timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+
+
+def purge_expired():
+    """Delete keys older than IDEMPOTENCY_KEY_TTL. Returns how many were removed."""
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=expiry_cutoff()).delete()
+    return deleted
+
+
+def _replay(record, fingerprint):
+    if record.request_hash != fingerprint:
+        return Response({'error': f"{HEADER} was already used for a different request"}, status=422)
+    response = Response(record.response, status=record.status_code)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _find(key):
+    return IdempotencyKey.objects.filter(key=key, created_at__gte=expiry_cutoff()).first()
+
+
+def idempotent(view):
+    """
+    Make a POST view safe to retry with an Idempotency-Key header.
+
+    The key row is inserted in the same transaction as the view's own
+    writes. A second request with the same key blocks on the unique index
+    until the first commits, then replays the stored response without
+    running the view. Only successful responses are stored; a failed
+    request rolls the key back so it can be retried.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view(request, *args, **kwargs)
+        if len(key) > 255:
+            return Response({'error': f"{HEADER} must be at most 255 characters"}, status=400)
+
+        fingerprint = request_hash(request)
+        record = _find(key)
+        if record:
+            return _replay(record, fingerprint)
+
+        # An expired key is free to be used again
+        IdempotencyKey.objects.filter(key=key, created_at__lt=expiry_cutoff()).delete()
+
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(key=key, request_hash=fingerprint)
+                response = view(request, *args, **kwargs)
+                if not 200 <= response.status_code < 300:
+                    transaction.set_rollback(True)
+                    return response
+                record.status_code = response.status_code
+                record.response = serialization.to_json(response.data)
+                record.save(update_fields=['status_code', 'response'])
+        except IntegrityError:
+            # A concurrent request with the same key committed first
+            record = _find(key)
+            if record is None:
+                raise
+            return _replay(record, fingerprint)
+        return response
+
+    return wrapper
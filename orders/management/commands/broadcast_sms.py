@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.broadcast import run_broadcast
+from orders.models import Broadcast
+
+
+class Command(BaseCommand):
+    help = "Send an SMS to every customer, or resume an interrupted broadcast"
+
+    def add_arguments(self, parser):
+        parser.add_argument('message', nargs='?',
+                            help="Message to send; {name} is replaced with the customer's name")
+        parser.add_argument('--resume', type=int, metavar='BROADCAST_ID',
+                            help="Continue a paused or interrupted broadcast")
+        parser.add_argument('--chunk-size', type=int, default=settings.SMS_BROADCAST_CHUNK_SIZE)
+        parser.add_argument('--recipients-per-call', type=int,
+                            default=settings.SMS_BROADCAST_RECIPIENTS_PER_CALL)
+
+    def handle(self, *args, **options):
+        if options['resume']:
+            try:
+                broadcast = Broadcast.objects.get(id=options['resume'])
+            except Broadcast.DoesNotExist:
+                raise CommandError(f"Broadcast {options['resume']} does not exist")
+            if broadcast.status == Broadcast.COMPLETED:
+                raise CommandError(f"Broadcast {broadcast.id} is already completed")
+        elif options['message']:
+            broadcast = Broadcast.objects.create(message=options['message'])
+        else:
+            raise CommandError("Give a message or --resume BROADCAST_ID")
+
+        self.stdout.write(f"Broadcast {broadcast.id}: starting after customer {broadcast.last_customer_id}")
+        broadcast = run_broadcast(
+            broadcast,
+            chunk_size=options['chunk_size'],
+            recipients_per_call=options['recipients_per_call'],
+            progress=self._report,
+        )
+
+        if broadcast.status == Broadcast.PAUSED:
+            raise CommandError(
+                f"Broadcast {broadcast.id} paused: {broadcast.last_error}. "
+                f"Resume with --resume {broadcast.id}"
+            )
+        self.stdout.write(
+            f"Broadcast {broadcast.id} completed: {broadcast.sent_count} sent, {broadcast.failed_count} failed"
+        )
+
+    def _report(self, broadcast):
+        done = broadcast.sent_count + broadcast.failed_count
+        self.stdout.write(
+            f"Broadcast {broadcast.id}: {done}/{broadcast.total_recipients} "
+            f"(last customer {broadcast.last_customer_id})"
+        )
@@ -0,0 +1,59 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from orders.dispatcher import Dispatcher
+
+
+class Command(BaseCommand):
+    help = "Drain the SMS outbox, sending queued order notifications"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.SMS_OUTBOX_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=settings.SMS_DISPATCH_WORKERS,
+                            help="Number of concurrent sender threads")
+        parser.add_argument('--rate', type=float, default=settings.SMS_DISPATCH_RATE,
+                            help="Maximum messages per second (0 disables the limit)")
+        parser.add_argument('--burst', type=int, default=settings.SMS_DISPATCH_BURST,
+                            help="Messages that may be sent back to back before the rate applies")
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help="Seconds to sleep when the outbox is empty")
+        parser.add_argument('--stats-interval', type=float, default=60.0,
+                            help="Seconds between throughput and queue-depth reports")
+        parser.add_argument('--once', action='store_true',
+                            help="Drain what is due now and exit")
+
+    def handle(self, *args, **options):
+        dispatcher = Dispatcher(
+            workers=options['workers'],
+            rate=options['rate'],
+            burst=options['burst'],
+            batch_size=options['batch_size'],
+        )
+        last_report = time.monotonic()
+        try:
+            while True:
+                attempted = dispatcher.run_once()
+
+                if time.monotonic() - last_report >= options['stats_interval']:
+                    self._report(dispatcher)
+                    last_report = time.monotonic()
+
+                if attempted:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        finally:
+            dispatcher.shutdown()
+
+        self.stdout.write(f"Dispatched {dispatcher.sent + dispatcher.failed} message(s)")
+
+    def _report(self, dispatcher):
+        stats = dispatcher.stats()
+        self.stdout.write(
+            f"sent={stats['sent']} failed={stats['failed']} "
+            f"throughput={stats['throughput_per_minute']:.0f}/min "
+            f"queue_depth={stats['queue_depth']} due={stats['due']}"
+        )
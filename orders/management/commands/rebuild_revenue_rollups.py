@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from orders.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily and per-customer revenue rollups from the orders table"
+
+    def handle(self, *args, **options):
+        days, customers = rebuild()
+        self.stdout.write(f"Rebuilt revenue rollups: {days} days, {customers} customers")
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from orders.fake_gateway import make_server
+
+
+class Command(BaseCommand):
+    help = "Run a local fake of the Africa's Talking SMS API for load tests"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8025)
+        parser.add_argument('--latency', type=float, default=0.1,
+                            help="Seconds each request takes")
+        parser.add_argument('--jitter', type=float, default=0.05,
+                            help="Extra random latency, up to this many seconds")
+        parser.add_argument('--error-rate', type=float, default=0.0,
+                            help="Fraction of requests answered with HTTP 500")
+        parser.add_argument('--verbose', action='store_true')
+
+    def handle(self, *args, **options):
+        server = make_server(
+            host=options['host'],
+            port=options['port'],
+            latency=options['latency'],
+            jitter=options['jitter'],
+            error_rate=options['error_rate'],
+            verbose=options['verbose'],
+        )
+        host, port = server.server_address[:2]
+        self.stdout.write(f"Fake SMS gateway listening on http://{host}:{port}/version1/messaging")
+        self.stdout.write("Point SMS_BACKEND at orders.sms_backends.HTTPBackend to use it")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(
+                f"Handled {server.requests} request(s), {server.messages} message(s), {server.errors} error(s)"
+            )
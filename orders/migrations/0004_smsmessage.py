@@ -0,0 +1,31 @@
+# Generated by Django 4.2.10 on 2026-10-18 01:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_broadcast'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SMSMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider_message_id', models.CharField(blank=True, max_length=100, null=True, unique=True)),
+                ('phone', models.CharField(max_length=20)),
+                ('status', models.CharField(max_length=30)),
+                ('status_code', models.IntegerField(blank=True, null=True)),
+                ('cost', models.CharField(blank=True, max_length=30)),
+                ('network_code', models.CharField(blank=True, max_length=10)),
+                ('failure_reason', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+                ('outbox_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='orders.outboxmessage')),
+            ],
+        ),
+    ]
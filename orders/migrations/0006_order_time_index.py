@@ -0,0 +1,17 @@
+# Generated by Django 4.2.10 on 2026-10-18 01:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['order_time', 'id'], name='orders_orde_order_t_272bbc_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.10 on 2026-10-18 01:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_order_time_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer', 'order_time'], name='orders_orde_custome_a5c30c_idx'),
+        ),
+    ]
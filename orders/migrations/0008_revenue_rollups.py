@@ -0,0 +1,57 @@
+# Generated by Django 4.2.10 on 2026-10-18 01:18
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+
+def backfill_rollups(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    DailyRevenue = apps.get_model('orders', 'DailyRevenue')
+    CustomerRevenue = apps.get_model('orders', 'CustomerRevenue')
+
+    daily = (
+        Order.objects.annotate(day=TruncDate('order_time'))
+        .values('day')
+        .annotate(order_count=Count('id'), revenue=Sum('amount'))
+        .order_by()
+    )
+    DailyRevenue.objects.bulk_create([DailyRevenue(**row) for row in daily], batch_size=1000)
+
+    per_customer = (
+        Order.objects.values('customer_id')
+        .annotate(order_count=Count('id'), revenue=Sum('amount'))
+        .order_by()
+    )
+    CustomerRevenue.objects.bulk_create([CustomerRevenue(**row) for row in per_customer], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_customer_phone_e164'),
+        ('orders', '0007_order_customer_time_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('order_count', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CustomerRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_count', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(db_index=True, decimal_places=2, default=0, max_digits=14)),
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='revenue', to='customers.customer')),
+            ],
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.10 on 2026-10-18 01:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0009_order_last_modified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='broadcast',
+            name='done_customer_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from customers.models import Customer
 
 class Order(models.Model):
@@ -6,6 +7,139 @@ class Order(models.Model):
     item = models.CharField(max_length=100)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     order_time = models.DateTimeField(auto_now_add=True)
+    # Drives the ETags of the order endpoints
+    last_modified = models.DateTimeField(auto_now=True, db_index=True)
     
+    class Meta:
+        indexes = [
+            # Keyset pagination in order_list and order_time range filters
+            models.Index(fields=['order_time', 'id']),
+            # Orders for one customer over a period
+            models.Index(fields=['customer', 'order_time']),
+        ]
+    
+    def __str__(self):
+        return f"{self.item} - {self.customer.name}"
+
+class OutboxMessage(models.Model):
+    """An SMS waiting to be sent by the dispatcher (transactional outbox)."""
+
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    order = models.ForeignKey(Order, null=True, blank=True, on_delete=models.SET_NULL)
+    phone = models.CharField(max_length=20)
+    message = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.phone} - {self.status}"
+
+
+class Broadcast(models.Model):
+    """
+    An SMS sent to every customer.
+
+    last_customer_id is the resume point: every customer with a lower or
+    equal id has already been handled. done_customer_ids lists the
+    customers past it that were already sent to by a gateway call, so a
+    broadcast interrupted partway through a chunk skips them on resume.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    PAUSED = 'paused'
+    COMPLETED = 'completed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (PAUSED, 'Paused'),
+        (COMPLETED, 'Completed'),
+    ]
+
+    message = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    last_customer_id = models.BigIntegerField(default=0)
+    done_customer_ids = models.JSONField(default=list, blank=True)
+    total_recipients = models.PositiveIntegerField(default=0)
+    sent_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Broadcast {self.id} - {self.status}"
+
+
+class SMSMessage(models.Model):
+    """One message accepted or rejected by the gateway, updated by delivery reports."""
+
+    provider_message_id = models.CharField(max_length=100, unique=True, null=True, blank=True)
+    phone = models.CharField(max_length=20)
+    status = models.CharField(max_length=30)
+    status_code = models.IntegerField(null=True, blank=True)
+    cost = models.CharField(max_length=30, blank=True)
+    network_code = models.CharField(max_length=10, blank=True)
+    failure_reason = models.CharField(max_length=100, blank=True)
+    outbox_message = models.ForeignKey(OutboxMessage, null=True, blank=True, on_delete=models.SET_NULL)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.phone} - {self.status}"
+
+
+class IdempotencyKey(models.Model):
+    """Stored response for a request sent with an Idempotency-Key header."""
+
+    key = models.CharField(max_length=255, unique=True)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.key
+
+
+class DailyRevenue(models.Model):
+    """Order count and revenue per day, kept up to date by orders.rollups."""
+
+    day = models.DateField(unique=True)
+    order_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.day} - {self.revenue}"
+
+
+class CustomerRevenue(models.Model):
+    """Order count and revenue per customer, kept up to date by orders.rollups."""
+
+    customer = models.OneToOneField(Customer, on_delete=models.CASCADE, related_name='revenue')
+    order_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, db_index=True)
+
     def __str__(self):
-        return f"{self.item} - {self.customer.name}"
\ No newline at end of file
+        return f"{self.customer_id} - {self.revenue}"
@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .circuit_breaker import CircuitOpenError
+from .models import OutboxMessage
+from . import sms
+
+
+def build_order_notification(order, customer):
+    """Unsaved outbox row for the order confirmation, or None if the customer has no valid phone."""
+    if not customer.phone_e164:
+        return None
+    return OutboxMessage(
+        order=order,
+        phone=customer.phone_e164,
+        message=sms.build_order_message(customer.name, order.item, str(order.amount)),
+    )
+
+
+def enqueue_order_notification(order, customer):
+    """
+    Queue the order confirmation SMS.
+
+    Call this inside the transaction that creates the order, so the
+    message exists if and only if the order does. Customers without a
+    valid phone number get no message.
+    """
+    message = build_order_notification(order, customer)
+    if message is not None:
+        message.save()
+    return message
+
+
+def enqueue_order_notifications(orders):
+    """Queue confirmations for many orders (with customers loaded) in one INSERT."""
+    messages = [build_order_notification(order, order.customer) for order in orders]
+    return OutboxMessage.objects.bulk_create([message for message in messages if message is not None])
+
+
+def defer_message(phone, message, order=None):
+    """Queue a message that could not be sent right away."""
+    return OutboxMessage.objects.create(order=order, phone=phone, message=message)
+
+
+def claim_batch(batch_size):
+    """
+    Lease up to batch_size due messages to this dispatcher.
+
+    Rows are locked with SKIP LOCKED so several dispatchers can drain the
+    outbox side by side. A message whose lease runs out (dispatcher died
+    mid-send) becomes due again.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects
+            .select_for_update(skip_locked=True)
+            .filter(Q(status=OutboxMessage.PENDING) | Q(status=OutboxMessage.SENDING), next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        lease_until = now + timedelta(seconds=settings.SMS_OUTBOX_LEASE_SECONDS)
+        for message in messages:
+            message.status = OutboxMessage.SENDING
+            message.next_attempt_at = lease_until
+        OutboxMessage.objects.bulk_update(messages, ['status', 'next_attempt_at'])
+    return messages
+
+
+def record_result(message, error=None):
+    """Update a claimed message after a send attempt (does not save)."""
+    now = timezone.now()
+    if isinstance(error, CircuitOpenError):
+        # Never reached the gateway, so it does not use up an attempt
+        message.status = OutboxMessage.PENDING
+        message.last_error = str(error)
+        retry_in = sms.breaker.stats()['retry_in'] or 0
+        message.next_attempt_at = now + timedelta(seconds=retry_in)
+        return
+
+    message.attempts += 1
+    if error is None:
+        message.status = OutboxMessage.SENT
+        message.sent_at = now
+        message.last_error = ''
+    elif message.attempts >= settings.SMS_OUTBOX_MAX_ATTEMPTS:
+        message.status = OutboxMessage.FAILED
+        message.last_error = str(error)
+    else:
+        message.status = OutboxMessage.PENDING
+        message.last_error = str(error)
+        delay = settings.SMS_OUTBOX_RETRY_DELAY * 2 ** (message.attempts - 1)
+        message.next_attempt_at = now + timedelta(seconds=delay)
+
+
+def save_results(messages):
+    OutboxMessage.objects.bulk_update(
+        messages, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+    )
+
+
+def dispatch_batch(batch_size=None, send=None):
+    """Send one batch of due messages. Returns how many were attempted."""
+    send = send or sms.send_sms
+    messages = claim_batch(batch_size or settings.SMS_OUTBOX_BATCH_SIZE)
+    log = []
+    for message in messages:
+        try:
+            response = send(message.phone, message.message)
+        except Exception as e:
+            record_result(message, e)
+        else:
+            record_result(message)
+            log.extend(sms.log_entries(response, outbox_message=message))
+    save_results(messages)
+    sms.save_log(log)
+    return len(messages)
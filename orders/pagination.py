@@ -0,0 +1,66 @@
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(order_time, pk):
+    raw = f"{order_time.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        order_time, pk = raw.split('|')
+        return datetime.fromisoformat(order_time), int(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def page_size_from(request):
+    """The requested ?page_size, clamped to ORDER_LIST_MAX_PAGE_SIZE."""
+    try:
+        page_size = int(request.query_params.get('page_size', settings.ORDER_LIST_PAGE_SIZE))
+    except ValueError:
+        raise ValueError('page_size must be an integer')
+    if page_size < 1:
+        raise ValueError('page_size must be positive')
+    return min(page_size, settings.ORDER_LIST_MAX_PAGE_SIZE)
+
+
+def after_cursor(queryset, cursor):
+    """Rows of `queryset` that come after `cursor`, ordered by (order_time, id)."""
+    queryset = queryset.order_by('order_time', 'id')
+    if cursor:
+        order_time, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(order_time__gt=order_time) | Q(order_time=order_time, id__gt=pk))
+    return queryset
+
+
+def keyset_page(queryset, cursor, page_size, serializer=None):
+    """
+    Return one page of rows ordered by (order_time, id) and the cursor of the next page.
+
+    Rows after the cursor are found with a range condition on the
+    (order_time, id) index, so every page costs the same no matter how
+    deep into the table it is. With a RowSerializer the rows are its
+    dicts, otherwise whatever the queryset yields; either way they must
+    include order_time and id.
+    """
+    page = after_cursor(queryset, cursor)[:page_size + 1]
+    rows = serializer.rows(page) if serializer else list(page)
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        if isinstance(last, dict):
+            next_cursor = encode_cursor(last['order_time'], last['id'])
+        else:
+            next_cursor = encode_cursor(last.order_time, last.id)
+    return rows, next_cursor
@@ -0,0 +1,125 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import CustomerRevenue, DailyRevenue, Order
+
+
+def order_key(order):
+    """What the rollups count for an order: (day, customer_id, amount)."""
+    return timezone.localdate(order.order_time), order.customer_id, Decimal(order.amount)
+
+
+def _bump(model, lookup, orders, revenue):
+    changes = {'order_count': F('order_count') + orders, 'revenue': F('revenue') + revenue}
+    if model.objects.filter(**lookup).update(**changes) or orders <= 0:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, order_count=orders, revenue=revenue)
+    except IntegrityError:
+        # Another request created the row first
+        model.objects.filter(**lookup).update(**changes)
+
+
+def apply(keys, sign=1):
+    """
+    Add (sign=1) or remove (sign=-1) orders, given as order_key() tuples.
+
+    Changes are grouped per day and per customer, so a batch costs one
+    UPDATE per distinct day and customer rather than one per order.
+    Counters are changed with F() expressions and never read first, so
+    concurrent writers do not lose updates.
+    """
+    _apply_signed([(key, sign) for key in keys])
+
+
+def move(removed, added):
+    """
+    Swap the orders counted as `removed` for `added` in a single pass.
+
+    Used when orders are edited in place: an amount change on the same day
+    and customer nets out to one revenue-only UPDATE per rollup table.
+    """
+    _apply_signed([(key, -1) for key in removed] + [(key, 1) for key in added])
+
+
+_grouping = threading.local()
+
+
+@contextmanager
+def grouped():
+    """
+    Collect every rollup change made inside the block, e.g. by the
+    post_delete handler while QuerySet.delete() removes many orders, and
+    apply them in one grouped pass when the block exits normally.
+    """
+    if getattr(_grouping, 'pending', None) is not None:
+        yield
+        return
+    _grouping.pending = []
+    try:
+        yield
+        pending = _grouping.pending
+    finally:
+        _grouping.pending = None
+    _apply_signed(pending)
+
+
+def _apply_signed(signed_keys):
+    pending = getattr(_grouping, 'pending', None)
+    if pending is not None:
+        pending.extend(signed_keys)
+        return
+
+    days = defaultdict(lambda: [0, Decimal(0)])
+    customers = defaultdict(lambda: [0, Decimal(0)])
+    for (day, customer_id, amount), sign in signed_keys:
+        for totals in (days[day], customers[customer_id]):
+            totals[0] += sign
+            totals[1] += sign * amount
+
+    for day, (orders, revenue) in days.items():
+        if orders or revenue:
+            _bump(DailyRevenue, {'day': day}, orders, revenue)
+    for customer_id, (orders, revenue) in customers.items():
+        if orders or revenue:
+            _bump(CustomerRevenue, {'customer_id': customer_id}, orders, revenue)
+
+
+def record_created(orders):
+    """Count orders inserted without signals, e.g. by bulk_create()."""
+    apply([order_key(order) for order in orders])
+
+
+def rebuild():
+    """Recompute both rollup tables from the orders table."""
+    with transaction.atomic():
+        DailyRevenue.objects.all().delete()
+        CustomerRevenue.objects.all().delete()
+
+        daily = (
+            Order.objects.annotate(day=TruncDate('order_time'))
+            .values('day')
+            .annotate(order_count=Count('id'), revenue=Sum('amount'))
+            .order_by()
+        )
+        DailyRevenue.objects.bulk_create(
+            [DailyRevenue(**row) for row in daily.iterator()], batch_size=1000
+        )
+
+        per_customer = (
+            Order.objects.values('customer_id')
+            .annotate(order_count=Count('id'), revenue=Sum('amount'))
+            .order_by()
+        )
+        CustomerRevenue.objects.bulk_create(
+            [CustomerRevenue(**row) for row in per_customer.iterator()], batch_size=1000
+        )
+    return DailyRevenue.objects.count(), CustomerRevenue.objects.count()
@@ -0,0 +1,19 @@
+from sms_service.serialization import RowSerializer
+
+order_serializer = RowSerializer(
+    id='id',
+    customer_id='customer_id',
+    customer_name='customer__name',
+    item='item',
+    amount='amount',
+    order_time='order_time',
+)
+
+daily_revenue_serializer = RowSerializer(day='day', orders='order_count', revenue='revenue')
+
+customer_revenue_serializer = RowSerializer(
+    customer_id='customer_id',
+    customer_name='customer__name',
+    orders='order_count',
+    revenue='revenue',
+)
@@ -0,0 +1,47 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import rollups
+from sms_service.etags import bump_table_version
+
+from .cache import order_cache
+from .models import Order
+
+ROLLUP_FIELDS = {'order_time', 'customer_id', 'amount'}
+
+
+@receiver(post_init, sender=Order)
+def remember_rollup_key(sender, instance, **kwargs):
+    # Loaded orders remember what the rollups count for them, so a save
+    # can move them between days or customers
+    if instance.pk is None or ROLLUP_FIELDS & instance.get_deferred_fields():
+        instance._rollup_key = None
+    else:
+        instance._rollup_key = rollups.order_key(instance)
+
+
+@receiver(post_save, sender=Order)
+def update_rollups_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    key = rollups.order_key(instance)
+    previous = getattr(instance, '_rollup_key', None)
+    if created:
+        rollups.apply([key])
+    elif previous is not None and previous != key:
+        rollups.apply([previous], sign=-1)
+        rollups.apply([key])
+    instance._rollup_key = key
+
+
+@receiver(post_delete, sender=Order)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    previous = getattr(instance, '_rollup_key', None) or rollups.order_key(instance)
+    rollups.apply([previous], sign=-1)
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def invalidate_order_cache(sender, instance, **kwargs):
+    order_cache.invalidate(instance.pk)
+    bump_table_version('orders')
@@ -1,24 +1,135 @@
-import africastalking
-import os
+import threading
 from django.conf import settings
+from django.utils.module_loading import import_string
+from customers.phone import to_e164
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
 
-username = settings.AT_USERNAME
-api_key = settings.AT_API_KEY
+# Africa's Talking per-recipient status codes that mean the message was accepted
+SUCCESS_STATUS_CODES = {100, 101, 102}
 
+_backends = {}
+_backends_lock = threading.Lock()
+
+breaker = CircuitBreaker('sms-gateway')
+
+
+class SMSDeliveryError(Exception):
+    pass
+
+
+def get_backend():
+    """Return the backend instance configured by SMS_BACKEND."""
+    path = settings.SMS_BACKEND
+    backend = _backends.get(path)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(path)
+            if backend is None:
+                backend = _backends[path] = import_string(path)()
+    return backend
+
+
+def build_order_message(customer_name, item, amount):
+    return f"Hello {customer_name}, order for {item} has been received. Total: Ksh {amount}. Thank you!"
+
+
+def normalize_phone(phone_number):
+    """E.164 form of a raw number; prefer Customer.phone_e164 where available."""
+    return to_e164(phone_number) or phone_number
+
+
+def _call_gateway(message, recipients):
+    try:
+        return breaker.call(get_backend().send, message, list(recipients))
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise SMSDeliveryError(str(e)) from e
+
+
+def _recipients(response):
+    if not isinstance(response, dict):
+        return []
+    return response.get('SMSMessageData', {}).get('Recipients', [])
+
+
+def rejected_recipients(response):
+    """(number, status) pairs the gateway did not accept."""
+    return [
+        (result.get('number'), result.get('status', 'Rejected by gateway'))
+        for result in _recipients(response)
+        if result.get('statusCode') not in SUCCESS_STATUS_CODES
+    ]
+
+
+def log_entries(response, outbox_message=None):
+    """Unsaved SMSMessage rows for each recipient in a gateway response."""
+    from .models import SMSMessage
+
+    entries = []
+    for result in _recipients(response):
+        message_id = result.get('messageId')
+        entries.append(SMSMessage(
+            provider_message_id=message_id if message_id and message_id != 'None' else None,
+            phone=result.get('number', ''),
+            status=result.get('status', ''),
+            status_code=result.get('statusCode'),
+            cost=result.get('cost', ''),
+            outbox_message=outbox_message,
+        ))
+    return entries
+
+
+def save_log(entries):
+    from .models import SMSMessage
+
+    if entries:
+        SMSMessage.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+def send_bulk(recipients, message):
+    """
+    Send one message to several recipients in a single gateway call.
+
+    Returns the gateway response; see rejected_recipients(). Transport
+    failures raise SMSDeliveryError, or CircuitOpenError while the
+    breaker is open.
+    """
+    return _call_gateway(message, recipients)
+
+
+def send_sms(phone_number, message):
+    """
+    Send one message, raising SMSDeliveryError if it was not accepted.
+
+    Gateway calls go through the circuit breaker; while it is open this
+    raises CircuitOpenError without touching the network.
+    """
+    response = _call_gateway(message, [phone_number])
+    rejected = rejected_recipients(response)
+    if rejected:
+        raise SMSDeliveryError(rejected[0][1])
+    return response
 
-africastalking.initialize(username, api_key)
-sms = africastalking.SMS
 
 def send_order_notification(phone_number, customer_name, item, amount):
-   
-    message = f"Hello {customer_name}, order for {item} has been received. Total: Ksh {amount}. Thank you!"
+    """
+    Send an order notification right away.
+
+    If the gateway fails or the circuit is open the message is deferred
+    to the outbox, where the dispatcher retries it.
+    """
+    from .outbox import defer_message
     
-    if not phone_number.startswith('+'):
-        phone_number = '+254' + phone_number.lstrip('0')
+    message = build_order_message(customer_name, item, amount)
+    
+    phone_number = normalize_phone(phone_number)
     
     try:
-        response = sms.send(message, [phone_number])
+        response = send_sms(phone_number, message)
+        save_log(log_entries(response))
         return response
-    except Exception as e:
-        print(f"Error sending SMS: {str(e)}")
-        return None
\ No newline at end of file
+    except (CircuitOpenError, SMSDeliveryError) as e:
+        print(f"Error sending SMS, deferring to outbox: {str(e)}")
+        defer_message(phone_number, message)
+        return None
@@ -1,11 +1,14 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 import json
-from .models import Order
+from .models import Order, OutboxMessage, Broadcast, SMSMessage, IdempotencyKey, DailyRevenue, CustomerRevenue
+from . import idempotency, sms_backends
 from customers.models import Customer
 from decimal import Decimal
 from unittest.mock import patch
 import os
+from django.utils import timezone
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -77,6 +80,41 @@ class OrderTests(TestCase):
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]['item'], 'Test Item')
         
+    def test_order_list_query_count_is_constant(self):
+        other = Customer.objects.create(name="Other", code="OTH1", phone="0722222222", email="o@example.com")
+        for i in range(20):
+            Order.objects.create(customer=other if i % 2 else self.customer, item=f"Item {i}", amount=Decimal("1.00"))
+
+        for page_size in (1, 5, 50):
+            # The ETag comes from cached table versions; only the page is queried
+            with self.assertNumQueries(1):
+                response = self.client.get(
+                    reverse('order-list'), {'page_size': page_size},
+                    HTTP_AUTHORIZATION=f'Bearer {self.token}'
+                )
+            self.assertEqual(len(response.json()), min(page_size, 21))
+        self.assertEqual(response.json()[2]['customer_name'], 'Other')
+
+    def test_order_list_cursor_pagination(self):
+        for i in range(6):
+            Order.objects.create(customer=self.customer, item=f"Item {i}", amount=Decimal("1.00"))
+
+        ids = []
+        params = {'page_size': 3}
+        while True:
+            response = self.client.get(reverse('order-list'), params, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+            self.assertEqual(response.status_code, 200)
+            ids.extend(order['id'] for order in response.json())
+            if 'X-Next-Cursor' not in response:
+                break
+            self.assertIn('rel="next"', response['Link'])
+            params = {'page_size': 3, 'cursor': response['X-Next-Cursor']}
+
+        self.assertEqual(ids, list(Order.objects.order_by('order_time', 'id').values_list('id', flat=True)))
+
+        response = self.client.get(reverse('order-list'), {'cursor': 'garbage'}, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(response.status_code, 400)
+        
     def test_order_detail(self):
         response = self.client.get(
             reverse('order-detail', args=[self.order.id]),
@@ -136,6 +174,27 @@ class OrderTests(TestCase):
         updated_order = Order.objects.get(id=self.order.id)
         self.assertEqual(updated_order.item, 'Updated Item')
         self.assertEqual(updated_order.amount, Decimal('149.99'))
+
+    def test_patch_order_issues_one_update(self):
+        with self.assertNumQueries(1):
+            response = self.client.patch(
+                reverse('order-update', args=[self.order.id]),
+                data=json.dumps({"item": "Patched Item"}),
+                content_type='application/json',
+                HTTP_AUTHORIZATION=f'Bearer {self.token}'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'id': self.order.id, 'item': 'Patched Item'})
+        self.assertEqual(Order.objects.get(id=self.order.id).item, 'Patched Item')
+
+    def test_patch_missing_order(self):
+        response = self.client.patch(
+            reverse('order-update', args=[self.order.id + 100]),
+            data=json.dumps({"item": "Nothing"}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {self.token}'
+        )
+        self.assertEqual(response.status_code, 404)
         
     def test_delete_order(self):
         response = self.client.delete(
@@ -143,4 +202,1025 @@ class OrderTests(TestCase):
             HTTP_AUTHORIZATION=f'Bearer {self.token}'
         )
         self.assertEqual(response.status_code, 204)
-        self.assertEqual(Order.objects.count(), 0)
\ No newline at end of file
+        self.assertEqual(Order.objects.count(), 0)
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        sms_backends.outbox.clear()
+        self.client = Client()
+        self.customer = Customer.objects.create(
+            name="Test Customer",
+            code="TEST123",
+            phone="0712345678",
+            email="test@example.com"
+        )
+        self.token = os.environ.get('ACCESS_TOKEN', '')
+
+    def _create_order(self):
+        return self.client.post(
+            reverse('order-create'),
+            data=json.dumps({"customer_id": self.customer.id, "item": "Queued Item", "amount": "50.00"}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {self.token}'
+        )
+
+    @override_settings(SMS_BACKEND='orders.sms_backends.LocMemBackend')
+    def test_create_order_queues_notification(self):
+        response = self._create_order()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sms_backends.outbox, [])
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.order_id, response.json()['id'])
+        self.assertEqual(message.phone, '+254712345678')
+        self.assertEqual(message.status, OutboxMessage.PENDING)
+        self.assertIn('Queued Item', message.message)
+
+    def test_dispatch_marks_messages_sent(self):
+        from .outbox import dispatch_batch
+
+        self._create_order()
+        sent = []
+
+        self.assertEqual(dispatch_batch(send=lambda phone, message: sent.append(phone)), 1)
+
+        self.assertEqual(sent, ['+254712345678'])
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.status, OutboxMessage.SENT)
+        self.assertIsNotNone(message.sent_at)
+        self.assertEqual(dispatch_batch(send=lambda phone, message: sent.append(phone)), 0)
+
+    def test_dispatch_retries_then_gives_up(self):
+        from .outbox import dispatch_batch
+        from .sms import SMSDeliveryError
+
+        self._create_order()
+
+        def failing_send(phone, message):
+            raise SMSDeliveryError("Gateway down")
+
+        with self.settings(SMS_OUTBOX_MAX_ATTEMPTS=2, SMS_OUTBOX_RETRY_DELAY=0):
+            dispatch_batch(send=failing_send)
+            message = OutboxMessage.objects.get()
+            self.assertEqual(message.status, OutboxMessage.PENDING)
+            self.assertEqual(message.attempts, 1)
+
+            dispatch_batch(send=failing_send)
+            message.refresh_from_db()
+            self.assertEqual(message.status, OutboxMessage.FAILED)
+            self.assertEqual(message.last_error, "Gateway down")
+
+    @override_settings(SMS_BACKEND='orders.sms_backends.LocMemBackend')
+    def test_dispatch_sms_command(self):
+        from django.core.management import call_command
+        from io import StringIO
+
+        self._create_order()
+        out = StringIO()
+
+        call_command('dispatch_sms', '--once', stdout=out)
+
+        self.assertIn('Dispatched 1 message(s)', out.getvalue())
+        self.assertEqual(OutboxMessage.objects.get().status, OutboxMessage.SENT)
+        self.assertEqual(sms_backends.outbox[0]['recipients'], ['+254712345678'])
+
+
+class DispatcherTests(TestCase):
+    def setUp(self):
+        OutboxMessage.objects.bulk_create([
+            OutboxMessage(phone=f"+25471234{i:04d}", message="Hello") for i in range(20)
+        ])
+
+    def test_sends_concurrently(self):
+        from .dispatcher import Dispatcher
+        import threading
+        import time
+
+        threads = set()
+
+        def fake_gateway(phone, message):
+            threads.add(threading.current_thread().name)
+            time.sleep(0.05)
+
+        dispatcher = Dispatcher(send=fake_gateway, workers=10, rate=0)
+        started = time.monotonic()
+        self.assertEqual(dispatcher.run_once(), 20)
+        elapsed = time.monotonic() - started
+        dispatcher.shutdown()
+
+        self.assertGreater(len(threads), 1)
+        self.assertLess(elapsed, 20 * 0.05)
+        self.assertEqual(OutboxMessage.objects.filter(status=OutboxMessage.SENT).count(), 20)
+        stats = dispatcher.stats()
+        self.assertEqual(stats['sent'], 20)
+        self.assertEqual(stats['queue_depth'], 0)
+
+    def test_rate_limit_is_enforced(self):
+        from .dispatcher import Dispatcher
+        import time
+
+        dispatcher = Dispatcher(send=lambda phone, message: None, workers=10, rate=100, burst=1, batch_size=11)
+        started = time.monotonic()
+        dispatcher.run_once()
+        elapsed = time.monotonic() - started
+        dispatcher.shutdown()
+
+        # 1 message from the burst, then 10 more at 100/s
+        self.assertGreaterEqual(elapsed, 0.09)
+        self.assertEqual(dispatcher.stats()['queue_depth'], 9)
+
+    def test_failures_are_counted(self):
+        from .dispatcher import Dispatcher
+
+        def flaky_gateway(phone, message):
+            if phone.endswith('1'):
+                raise ValueError("Rejected")
+
+        dispatcher = Dispatcher(send=flaky_gateway, workers=4, rate=0)
+        dispatcher.run_once()
+        dispatcher.shutdown()
+
+        self.assertEqual(dispatcher.failed, 2)
+        self.assertEqual(dispatcher.sent, 18)
+        self.assertEqual(OutboxMessage.objects.filter(status=OutboxMessage.PENDING, attempts=1).count(), 2)
+
+
+class SMSBackendTests(TestCase):
+    def setUp(self):
+        import threading
+        from .fake_gateway import make_server
+        from .sms import breaker
+
+        breaker.reset()
+        self.addCleanup(breaker.reset)
+
+        self.server = make_server(port=0, latency=0.01)
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.gateway_url = f"http://127.0.0.1:{self.server.server_address[1]}/version1/messaging"
+
+    def test_http_backend_against_fake_gateway(self):
+        from .sms import send_sms
+
+        with self.settings(SMS_BACKEND='orders.sms_backends.HTTPBackend', SMS_HTTP_GATEWAY_URL=self.gateway_url):
+            response = send_sms('+254712345678', 'Hello')
+
+        recipient = response['SMSMessageData']['Recipients'][0]
+        self.assertEqual(recipient['number'], '+254712345678')
+        self.assertEqual(recipient['statusCode'], 101)
+        self.assertEqual(self.server.messages, 1)
+
+    def test_dispatcher_against_failing_fake_gateway(self):
+        from .dispatcher import Dispatcher
+
+        self.server.error_rate = 1.0
+        OutboxMessage.objects.create(phone='+254712345678', message='Hello')
+
+        with self.settings(SMS_BACKEND='orders.sms_backends.HTTPBackend', SMS_HTTP_GATEWAY_URL=self.gateway_url):
+            dispatcher = Dispatcher(workers=2, rate=0)
+            dispatcher.run_once()
+            dispatcher.shutdown()
+
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.status, OutboxMessage.PENDING)
+        self.assertIn('500', message.last_error)
+        self.assertEqual(self.server.errors, 1)
+
+    @override_settings(SMS_BACKEND='orders.sms_backends.LocMemBackend')
+    def test_locmem_backend_records_messages(self):
+        from .sms import send_order_notification
+
+        sms_backends.outbox.clear()
+        send_order_notification('0712345678', 'Test Customer', 'Widget', '10.00')
+
+        self.assertEqual(sms_backends.outbox[0]['recipients'], ['+254712345678'])
+        self.assertIn('Widget', sms_backends.outbox[0]['message'])
+
+
+@override_settings(
+    SMS_BREAKER_MIN_CALLS=4,
+    SMS_BREAKER_WINDOW=4,
+    SMS_BREAKER_FAILURE_RATE=0.5,
+    SMS_BREAKER_RESET_TIMEOUT=30,
+    SMS_BREAKER_HALF_OPEN_CALLS=1,
+)
+class CircuitBreakerTests(TestCase):
+    def setUp(self):
+        from .circuit_breaker import CircuitBreaker
+
+        self.breaker = CircuitBreaker('test')
+
+    def _fail(self):
+        raise ConnectionError("Gateway timeout")
+
+    def _trip(self, breaker):
+        for _ in range(4):
+            with self.assertRaises(ConnectionError):
+                breaker.call(self._fail)
+
+    def test_opens_at_failure_rate_and_fails_fast(self):
+        from .circuit_breaker import CircuitOpenError
+
+        self.breaker.call(lambda: None)
+        with self.assertRaises(ConnectionError):
+            self.breaker.call(self._fail)
+        with self.assertRaises(ConnectionError):
+            self.breaker.call(self._fail)
+        # Below SMS_BREAKER_MIN_CALLS, so no verdict yet
+        self.assertEqual(self.breaker.state, 'closed')
+
+        with self.assertRaises(ConnectionError):
+            self.breaker.call(self._fail)
+        self.assertEqual(self.breaker.state, 'open')
+
+        called = []
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(lambda: called.append(True))
+        self.assertEqual(called, [])
+        self.assertEqual(self.breaker.stats()['rejected'], 1)
+
+    def test_half_open_probe_closes_or_reopens(self):
+        from .circuit_breaker import CircuitOpenError
+
+        self._trip(self.breaker)
+        self.breaker._opened_at -= 31
+        self.assertEqual(self.breaker.state, 'half_open')
+
+        # The probe is in flight, so other calls still fail fast
+        self.breaker._before_call()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(lambda: None)
+        self.breaker._record(False)
+        self.assertEqual(self.breaker.state, 'open')
+
+        self.breaker._opened_at -= 31
+        self.breaker.call(lambda: None)
+        self.assertEqual(self.breaker.state, 'closed')
+
+    @override_settings(SMS_BACKEND='orders.sms_backends.LocMemBackend')
+    def test_open_circuit_defers_order_notification(self):
+        from .sms import breaker, send_order_notification
+
+        breaker.reset()
+        self.addCleanup(breaker.reset)
+        self._trip(breaker)
+        sms_backends.outbox.clear()
+
+        self.assertIsNone(send_order_notification('0712345678', 'Test Customer', 'Widget', '10.00'))
+
+        self.assertEqual(sms_backends.outbox, [])
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.phone, '+254712345678')
+        self.assertEqual(message.status, OutboxMessage.PENDING)
+
+    def test_open_circuit_does_not_use_up_attempts(self):
+        from .dispatcher import Dispatcher
+        from .sms import breaker
+
+        breaker.reset()
+        self.addCleanup(breaker.reset)
+        self._trip(breaker)
+        OutboxMessage.objects.create(phone='+254712345678', message='Hello')
+
+        dispatcher = Dispatcher(workers=1, rate=0)
+        dispatcher.run_once()
+        dispatcher.shutdown()
+
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.attempts, 0)
+        self.assertGreater(message.next_attempt_at, timezone.now())
+
+    def test_status_endpoint(self):
+        from .sms import breaker
+
+        breaker.reset()
+        self.addCleanup(breaker.reset)
+        self._trip(breaker)
+
+        response = self.client.get(reverse('sms-status'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['state'], 'open')
+        self.assertEqual(response.json()['queue_depth'], 0)
+
+
+@override_settings(SMS_BACKEND='orders.sms_backends.LocMemBackend', SMS_DISPATCH_RATE=0)
+class BroadcastTests(TestCase):
+    def setUp(self):
+        from .sms import breaker
+
+        breaker.reset()
+        sms_backends.outbox.clear()
+        for i in range(10):
+            Customer.objects.create(name=f"Customer {i}", code=f"C{i:03d}", phone=f"07{i:08d}", email=f"c{i}@example.com")
+
+    def test_identical_messages_share_gateway_calls(self):
+        from .broadcast import run_broadcast
+
+        broadcast = run_broadcast(Broadcast.objects.create(message="Outage tonight"), chunk_size=4, recipients_per_call=3)
+
+        self.assertEqual(broadcast.status, Broadcast.COMPLETED)
+        self.assertEqual(broadcast.sent_count, 10)
+        self.assertEqual([len(call['recipients']) for call in sms_backends.outbox], [3, 1, 3, 1, 2])
+        self.assertEqual(broadcast.last_customer_id, Customer.objects.order_by('-id').first().id)
+
+    def test_personalized_messages(self):
+        from .broadcast import run_broadcast
+
+        run_broadcast(Broadcast.objects.create(message="Hi {name}"), chunk_size=100)
+
+        self.assertEqual(len(sms_backends.outbox), 10)
+        self.assertEqual(sms_backends.outbox[0]['message'], "Hi Customer 0")
+
+    def test_resume_skips_customers_already_done(self):
+        from .broadcast import run_broadcast
+        from .sms import SMSDeliveryError, send_bulk
+
+        calls = []
+
+        def flaky_send_bulk(recipients, message):
+            calls.append(recipients)
+            if len(calls) == 2:
+                raise SMSDeliveryError("Gateway down")
+            return send_bulk(recipients, message)
+
+        broadcast = Broadcast.objects.create(message="Promo")
+        with patch('orders.sms.send_bulk', side_effect=flaky_send_bulk):
+            broadcast = run_broadcast(broadcast, chunk_size=5)
+        self.assertEqual(broadcast.status, Broadcast.PAUSED)
+        self.assertEqual(broadcast.sent_count, 5)
+
+        broadcast = run_broadcast(Broadcast.objects.get(id=broadcast.id), chunk_size=5)
+
+        self.assertEqual(broadcast.status, Broadcast.COMPLETED)
+        self.assertEqual(broadcast.sent_count, 10)
+        sent_numbers = [number for call in sms_backends.outbox for number in call['recipients']]
+        self.assertEqual(len(sent_numbers), len(set(sent_numbers)))
+        self.assertEqual(len(sent_numbers), 10)
+
+    def test_resume_after_failure_inside_a_chunk(self):
+        from .broadcast import run_broadcast
+        from .sms import SMSDeliveryError, send_bulk
+
+        calls = []
+
+        def flaky_send_bulk(recipients, message):
+            calls.append(recipients)
+            if len(calls) == 2:
+                raise SMSDeliveryError("Gateway down")
+            return send_bulk(recipients, message)
+
+        broadcast = Broadcast.objects.create(message="Promo")
+        with patch('orders.sms.send_bulk', side_effect=flaky_send_bulk):
+            broadcast = run_broadcast(broadcast, chunk_size=5, recipients_per_call=2)
+        self.assertEqual(broadcast.status, Broadcast.PAUSED)
+        self.assertEqual(broadcast.sent_count, 2)
+        self.assertEqual(len(broadcast.done_customer_ids), 2)
+
+        broadcast = run_broadcast(Broadcast.objects.get(id=broadcast.id), chunk_size=5, recipients_per_call=2)
+
+        self.assertEqual(broadcast.status, Broadcast.COMPLETED)
+        self.assertEqual(broadcast.sent_count, 10)
+        self.assertEqual(broadcast.done_customer_ids, [])
+        sent_numbers = [number for call in sms_backends.outbox for number in call['recipients']]
+        self.assertEqual(len(sent_numbers), 10)
+        self.assertEqual(len(set(sent_numbers)), 10)
+
+    @override_settings(SMS_DISPATCH_RATE=100, SMS_DISPATCH_BURST=4)
+    def test_rate_limit_counts_recipients(self):
+        import time
+        from .broadcast import run_broadcast
+
+        # Two calls of 5 recipients are 10 messages: the second call waits
+        # for the bucket (burst 4) to refill at 100 messages per second
+        started = time.monotonic()
+        run_broadcast(Broadcast.objects.create(message="Promo"), chunk_size=100, recipients_per_call=5)
+
+        self.assertEqual(len(sms_backends.outbox), 2)
+        self.assertGreaterEqual(time.monotonic() - started, 0.04)
+
+    def test_broadcast_command(self):
+        from django.core.management import call_command
+        from io import StringIO
+
+        out = StringIO()
+        call_command('broadcast_sms', 'Hello all', '--chunk-size', '5', stdout=out)
+
+        self.assertIn('5/10', out.getvalue())
+        self.assertIn('completed: 10 sent, 0 failed', out.getvalue())
+
+
+@override_settings(SMS_DELIVERY_REPORT_FLUSH_INTERVAL=0, SMS_DELIVERY_REPORT_BATCH_SIZE=3, SMS_DELIVERY_REPORT_TOKEN='s3cret')
+class DeliveryReportTests(TestCase):
+    def setUp(self):
+        from .delivery_reports import buffer
+        from .sms import breaker
+
+        breaker.reset()
+        buffer.flush()
+        self.buffer = buffer
+        self.client = Client()
+        self.url = reverse('sms-delivery-report')
+        for i in range(3):
+            SMSMessage.objects.create(provider_message_id=f"ATXid_{i}", phone=f"+25470000000{i}", status='Sent')
+
+    def report(self, message_id, status, **extra):
+        return self.client.post(f"{self.url}?token=s3cret", {'id': message_id, 'status': status, **extra})
+
+    def test_reports_are_written_in_batches(self):
+        self.report('ATXid_0', 'Success', networkCode='63902')
+        self.report('ATXid_1', 'Failed', failureReason='UserInBlacklist')
+        self.assertEqual(SMSMessage.objects.filter(status='Sent').count(), 3)
+
+        with self.assertNumQueries(2):
+            response = self.report('ATXid_2', 'Success')
+
+        self.assertEqual(response.status_code, 200)
+        delivered = SMSMessage.objects.get(provider_message_id='ATXid_0')
+        self.assertEqual(delivered.network_code, '63902')
+        self.assertIsNotNone(delivered.delivered_at)
+        failed = SMSMessage.objects.get(provider_message_id='ATXid_1')
+        self.assertEqual(failed.failure_reason, 'UserInBlacklist')
+        self.assertIsNone(failed.delivered_at)
+
+    def test_repeat_callbacks_are_coalesced(self):
+        self.report('ATXid_0', 'Buffered')
+        self.report('ATXid_0', 'Success')
+        self.report('ATXid_unknown', 'Success', phoneNumber='+254799999999')
+
+        self.assertEqual(len(self.buffer), 2)
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(SMSMessage.objects.get(provider_message_id='ATXid_0').status, 'Success')
+        self.assertFalse(SMSMessage.objects.filter(provider_message_id='ATXid_unknown').exists())
+
+    @override_settings(SMS_DELIVERY_REPORT_STORE_UNKNOWN=True)
+    def test_unknown_messages_can_be_stored(self):
+        self.report('ATXid_unknown', 'Success', phoneNumber='+254799999999')
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(SMSMessage.objects.get(provider_message_id='ATXid_unknown').phone, '+254799999999')
+
+    def test_shared_secret(self):
+        data = {'id': 'ATXid_0', 'status': 'Success'}
+        self.assertEqual(self.client.post(self.url, data).status_code, 403)
+        self.assertEqual(self.client.post(f"{self.url}?token=wrong", data).status_code, 403)
+        self.assertEqual(self.client.post(f"{self.url}?token=s3cret", data).status_code, 200)
+
+        # Closed until a token is configured
+        with override_settings(SMS_DELIVERY_REPORT_TOKEN=''):
+            self.assertEqual(self.client.post(self.url, data).status_code, 403)
+        self.assertEqual(len(self.buffer), 1)
+
+    def test_sends_are_logged(self):
+        from .dispatcher import Dispatcher
+
+        customer = Customer.objects.create(name="Log", code="LOG1", phone="0711111111", email="log@example.com")
+        order = Order.objects.create(customer=customer, item="Book", amount=Decimal("5.00"))
+        OutboxMessage.objects.create(order=order, phone=customer.phone_e164, message="Hi")
+
+        with override_settings(SMS_BACKEND='orders.sms_backends.LocMemBackend'):
+            dispatcher = Dispatcher(rate=0, workers=1)
+            dispatcher.run_once()
+            dispatcher.shutdown()
+
+        logged = SMSMessage.objects.get(phone='+254711111111')
+        self.assertTrue(logged.provider_message_id.startswith('ATXid_'))
+        self.assertEqual(logged.outbox_message.order, order)
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.customer = Customer.objects.create(
+            name="Test Customer",
+            code="TEST123",
+            phone="0712345678",
+            email="test@example.com"
+        )
+        self.token = os.environ.get('ACCESS_TOKEN', '')
+
+    def _create_order(self, key, amount="50.00"):
+        return self.client.post(
+            reverse('order-create'),
+            data=json.dumps({"customer_id": self.customer.id, "item": "Retried Item", "amount": amount}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {self.token}',
+            HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retry_replays_stored_response(self):
+        first = self._create_order('order-1')
+        with self.assertNumQueries(1):
+            retry = self._create_order('order-1')
+
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+
+    def test_key_reused_for_different_request(self):
+        self._create_order('order-1')
+        response = self._create_order('order-1', amount="75.00")
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_failed_request_does_not_keep_key(self):
+        response = self._create_order('order-1', amount="not a number")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        self.assertEqual(self._create_order('order-1').status_code, 201)
+
+    def test_concurrent_duplicate_replays_winner(self):
+        first = self._create_order('order-1')
+        real_find = idempotency._find
+        calls = []
+
+        def find_after_commit(key):
+            # The first lookup runs before the other request commits
+            calls.append(key)
+            return None if len(calls) == 1 else real_find(key)
+
+        with patch('orders.idempotency._find', side_effect=find_after_commit):
+            retry = self._create_order('order-1')
+
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_expired_keys_are_purged(self):
+        self._create_order('order-1')
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+
+        self.assertEqual(idempotency.purge_expired(), 1)
+        self.assertEqual(self._create_order('order-1').status_code, 201)
+        self.assertEqual(Order.objects.count(), 2)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.customer = Customer.objects.create(name="Export, Ltd", code="EXP1", phone="0712345678", email="e@example.com")
+        for i, day in enumerate([1, 15, 31]):
+            order = Order.objects.create(customer=self.customer, item=f"Item {i}", amount=Decimal("1000.50"))
+            Order.objects.filter(id=order.id).update(order_time=timezone.make_aware(datetime(2024, 1, day, 12)))
+        self.token = os.environ.get('ACCESS_TOKEN', '')
+
+    def export(self, **params):
+        extra = params.pop('headers', {})
+        return self.client.get(reverse('order-export'), params, HTTP_AUTHORIZATION=f'Bearer {self.token}', **extra)
+
+    def test_ndjson_export(self):
+        response = self.export()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['item'] for row in rows], ['Item 0', 'Item 1', 'Item 2'])
+        self.assertEqual(rows[0]['amount'], '1000.50')
+        self.assertEqual(rows[0]['customer_name'], 'Export, Ltd')
+
+    def test_csv_export_with_date_range(self):
+        import csv
+
+        response = self.export(output='csv', start='2024-01-10', end='2024-01-31')
+
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0], ['id', 'customer_id', 'customer_name', 'item', 'amount', 'order_time'])
+        self.assertEqual([row[3] for row in rows[1:]], ['Item 1', 'Item 2'])
+        self.assertEqual(rows[1][2], 'Export, Ltd')
+
+    def test_gzip_export(self):
+        import gzip
+
+        response = self.export(headers={'HTTP_ACCEPT_ENCODING': 'gzip, deflate'})
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        lines = gzip.decompress(b''.join(response.streaming_content)).splitlines()
+        self.assertEqual(len(lines), 3)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.export(output='xml').status_code, 400)
+        self.assertEqual(self.export(start='yesterday').status_code, 400)
+
+
+class BulkCreateTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.customers = [
+            Customer.objects.create(name=f"Customer {i}", code=f"BULK{i}", phone=f"07{i:08d}", email=f"b{i}@example.com")
+            for i in range(3)
+        ]
+        self.token = os.environ.get('ACCESS_TOKEN', '')
+
+    def bulk_create(self, orders):
+        return self.client.post(
+            reverse('order-bulk-create'),
+            data=json.dumps({'orders': orders}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {self.token}'
+        )
+
+    def test_creates_orders_with_constant_queries(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        def orders(count):
+            return [
+                {'customer_id': self.customers[i % 3].id, 'item': f"Item {i}", 'amount': '1,000.00'}
+                for i in range(count)
+            ]
+
+        # The first batch also creates the rollup rows
+        self.bulk_create(orders(3))
+        with CaptureQueriesContext(connection) as small:
+            self.bulk_create(orders(3))
+        with CaptureQueriesContext(connection) as large:
+            response = self.bulk_create(orders(60))
+
+        self.assertEqual(len(large), len(small))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['created'], 60)
+        self.assertEqual(Order.objects.count(), 66)
+        self.assertEqual(OutboxMessage.objects.count(), 66)
+        result = response.json()['results'][4]
+        self.assertEqual(result['order']['customer_name'], 'Customer 1')
+        self.assertEqual(result['order']['amount'], '1000.00')
+
+    def test_partial_failure(self):
+        response = self.bulk_create([
+            {'customer_id': self.customers[0].id, 'item': "Good", 'amount': '10'},
+            {'customer_id': 99999, 'item': "Unknown customer", 'amount': '10'},
+            {'customer_id': self.customers[1].id, 'item': "Bad amount", 'amount': 'ten'},
+            {'customer_id': self.customers[1].id, 'item': "Missing amount"},
+        ])
+
+        self.assertEqual(response.status_code, 207)
+        data = response.json()
+        self.assertEqual((data['created'], data['failed']), (1, 3))
+        self.assertEqual([result['status'] for result in data['results']], ['created', 'error', 'error', 'error'])
+        self.assertIn('99999', data['results'][1]['error'])
+        self.assertEqual(Order.objects.get().item, "Good")
+
+    def test_values_the_columns_cannot_hold_fail_their_item(self):
+        good = {'customer_id': self.customers[0].id, 'item': "Good", 'amount': '10.00'}
+        response = self.bulk_create([
+            good,
+            {'customer_id': self.customers[0].id, 'item': "Too big", 'amount': '123456789012.5'},
+            {'customer_id': self.customers[0].id, 'item': "Not a number", 'amount': 'NaN'},
+            {'customer_id': self.customers[0].id, 'item': "Infinite", 'amount': 'Infinity'},
+            {'customer_id': self.customers[0].id, 'item': "x" * 101, 'amount': '10.00'},
+        ])
+
+        self.assertEqual(response.status_code, 207)
+        data = response.json()
+        self.assertEqual((data['created'], data['failed']), (1, 4))
+        self.assertEqual([result['status'] for result in data['results']], ['created'] + ['error'] * 4)
+        self.assertTrue(data['results'][4]['error'].startswith('item:'))
+        self.assertEqual(Order.objects.get().item, "Good")
+
+    def test_rejects_empty_and_oversized_batches(self):
+        self.assertEqual(self.bulk_create([]).status_code, 400)
+        with override_settings(ORDER_BULK_MAX_ITEMS=2):
+            orders = [{'customer_id': self.customers[0].id, 'item': "x", 'amount': '1'}] * 3
+            self.assertEqual(self.bulk_create(orders).status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+
+class BulkWriteTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.client = Client()
+        self.alice = Customer.objects.create(name="Alice", code="ALICE", phone="0711111111", email="a@example.com")
+        self.bob = Customer.objects.create(name="Bob", code="BOB", phone="0722222222", email="b@example.com")
+        self.orders = [
+            Order.objects.create(customer=self.alice if i % 2 else self.bob, item=f"Item {i}", amount=Decimal("10.00"))
+            for i in range(6)
+        ]
+        self.token = os.environ.get('ACCESS_TOKEN', '')
+
+    def post(self, name, data):
+        return self.client.post(
+            reverse(name),
+            data=json.dumps(data),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {self.token}'
+        )
+
+    @override_settings(ORDER_BULK_BATCH_SIZE=2)
+    def test_bulk_update_by_ids(self):
+        ids = [order.id for order in self.orders[:3]] + [99999]
+        # Cached before the update, so a stale entry would show
+        self.client.get(reverse('order-detail', args=[ids[0]]), HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+        response = self.post('order-bulk-update', {'ids': ids, 'changes': {'amount': '1,000.00', 'item': "Repriced"}})
+
+        self.assertEqual(response.json(), {'matched': 4, 'updated': 3})
+        self.assertEqual(Order.objects.filter(item="Repriced", amount=Decimal("1000.00")).count(), 3)
+        detail = self.client.get(reverse('order-detail', args=[ids[0]]), HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(detail.json()['amount'], "1000.00")
+        today = timezone.localdate(self.orders[0].order_time)
+        self.assertEqual(DailyRevenue.objects.get(day=today).revenue, Decimal("3030.00"))
+        self.assertEqual(CustomerRevenue.objects.get(customer=self.bob).revenue, Decimal("2010.00"))
+
+    @override_settings(ORDER_BULK_BATCH_SIZE=2)
+    def test_bulk_delete_by_filter(self):
+        from .outbox import enqueue_order_notification
+
+        message = enqueue_order_notification(self.orders[1], self.alice)
+
+        response = self.post('order-bulk-delete', {'filter': {'customer_id': self.alice.id}})
+
+        self.assertEqual(response.json(), {'matched': 3, 'deleted': 3})
+        self.assertFalse(Order.objects.filter(customer=self.alice).exists())
+        self.assertEqual(Order.objects.count(), 3)
+        self.assertEqual(CustomerRevenue.objects.get(customer=self.alice).order_count, 0)
+        self.assertEqual(CustomerRevenue.objects.get(customer=self.bob).revenue, Decimal("30.00"))
+        self.assertEqual(DailyRevenue.objects.get().order_count, 3)
+        message.refresh_from_db()
+        self.assertIsNone(message.order_id)
+
+    def test_rejects_malformed_and_oversized_requests(self):
+        self.assertEqual(self.post('order-bulk-delete', {}).status_code, 400)
+        self.assertEqual(self.post('order-bulk-delete', ["a"]).status_code, 400)
+        self.assertEqual(self.post('order-bulk-update', ["a"]).status_code, 400)
+        self.assertEqual(self.post('order-bulk-delete', {'ids': [1], 'filter': {'customer_id': 1}}).status_code, 400)
+        self.assertEqual(self.post('order-bulk-update', {'ids': [self.orders[0].id], 'changes': {}}).status_code, 400)
+        self.assertEqual(self.post('order-bulk-update', {'ids': ['x'], 'changes': {'item': "y"}}).status_code, 400)
+        with override_settings(ORDER_BULK_WRITE_MAX_ITEMS=5):
+            response = self.post('order-bulk-delete', {'filter': {'min_amount': '1'}})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('more than 5', response.json()['error'])
+        self.assertEqual(Order.objects.count(), 6)
+
+    def test_changes_the_columns_cannot_hold_are_rejected(self):
+        ids = [order.id for order in self.orders]
+        for changes in ({'amount': '1e20'}, {'amount': 'NaN'}, {'item': ["x"]}, {'item': "x" * 300}):
+            response = self.post('order-bulk-update', {'ids': ids, 'changes': changes})
+            self.assertEqual(response.status_code, 400, changes)
+        self.assertEqual(Order.objects.filter(amount=Decimal("10.00")).count(), 6)
+        self.assertFalse(Order.objects.exclude(item__startswith="Item").exists())
+
+    def test_rejects_filters_that_would_match_everything(self):
+        for params in ({'customer': self.alice.id}, {'customer_id': ''}, {'customer_id': None}, {}):
+            response = self.post('order-bulk-delete', {'filter': params})
+            self.assertEqual(response.status_code, 400, params)
+        response = self.post('order-bulk-update', {'filter': {'customerid': self.alice.id}, 'changes': {'amount': '1'}})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('customerid', response.json()['error'])
+        self.assertEqual(Order.objects.filter(amount=Decimal("10.00")).count(), 6)
+
+
+class OrderFilterTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.alice = Customer.objects.create(name="Alice", code="ALICE", phone="0711111111", email="a@example.com")
+        self.bob = Customer.objects.create(name="Bob", code="BOB", phone="0722222222", email="b@example.com")
+        for customer, day, amount in [
+            (self.alice, 1, "10.00"), (self.alice, 8, "250.00"), (self.bob, 8, "99.99"), (self.alice, 20, "5000.00"),
+        ]:
+            order = Order.objects.create(customer=customer, item=f"{customer.name} {day}", amount=Decimal(amount))
+            Order.objects.filter(id=order.id).update(order_time=timezone.make_aware(datetime(2024, 3, day, 9)))
+        self.token = os.environ.get('ACCESS_TOKEN', '')
+
+    def items(self, **params):
+        response = self.client.get(reverse('order-list'), params, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(response.status_code, 200)
+        return [order['item'] for order in response.json()]
+
+    def test_filters(self):
+        self.assertEqual(self.items(customer_id=self.alice.id), ["Alice 1", "Alice 8", "Alice 20"])
+        self.assertEqual(self.items(start='2024-03-05', end='2024-03-08'), ["Alice 8", "Bob 8"])
+        self.assertEqual(self.items(min_amount='99.99', max_amount='1,000'), ["Alice 8", "Bob 8"])
+        self.assertEqual(self.items(customer_id=self.alice.id, start='2024-03-02T00:00:00', max_amount='300'), ["Alice 8"])
+
+    def test_filters_combine_with_pagination(self):
+        response = self.client.get(
+            reverse('order-list'), {'customer_id': self.alice.id, 'page_size': 2},
+            HTTP_AUTHORIZATION=f'Bearer {self.token}'
+        )
+        cursor = response['X-Next-Cursor']
+        self.assertEqual(self.items(customer_id=self.alice.id, page_size=2, cursor=cursor), ["Alice 20"])
+
+        # The Link header keeps the filters, so Bob's order stays out
+        next_url = response['Link'].split(';')[0].strip('<>')
+        response = self.client.get(next_url, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual([order['item'] for order in response.json()], ["Alice 20"])
+        self.assertNotIn('Link', response)
+
+    def test_invalid_filters(self):
+        for params in ({'customer_id': 'alice'}, {'min_amount': 'lots'}, {'end': '2024-13-01'}):
+            response = self.client.get(reverse('order-list'), params, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+            self.assertEqual(response.status_code, 400)
+
+
+class RevenueRollupTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.alice = Customer.objects.create(name="Alice", code="ALICE", phone="0711111111", email="a@example.com")
+        self.bob = Customer.objects.create(name="Bob", code="BOB", phone="0722222222", email="b@example.com")
+        self.token = os.environ.get('ACCESS_TOKEN', '')
+
+    def totals(self):
+        daily = {row.day: (row.order_count, row.revenue) for row in DailyRevenue.objects.all()}
+        customers = {row.customer_id: (row.order_count, row.revenue) for row in CustomerRevenue.objects.all()}
+        return daily, customers
+
+    def test_rollups_follow_order_changes(self):
+        first = Order.objects.create(customer=self.alice, item="A", amount=Decimal("100.00"))
+        Order.objects.create(customer=self.alice, item="B", amount=Decimal("50.50"))
+        Order.objects.create(customer=self.bob, item="C", amount=Decimal("20.00"))
+        today = timezone.localdate(first.order_time)
+
+        daily, customers = self.totals()
+        self.assertEqual(daily[today], (3, Decimal("170.50")))
+        self.assertEqual(customers[self.alice.id], (2, Decimal("150.50")))
+
+        order = Order.objects.get(id=first.id)
+        order.amount = Decimal("80.00")
+        order.customer = self.bob
+        order.save()
+        daily, customers = self.totals()
+        self.assertEqual(daily[today], (3, Decimal("150.50")))
+        self.assertEqual(customers[self.alice.id], (1, Decimal("50.50")))
+        self.assertEqual(customers[self.bob.id], (2, Decimal("100.00")))
+
+        Order.objects.get(id=first.id).delete()
+        daily, customers = self.totals()
+        self.assertEqual(daily[today], (2, Decimal("70.50")))
+        self.assertEqual(customers[self.bob.id], (1, Decimal("20.00")))
+
+    def test_patch_amount_moves_revenue(self):
+        order = Order.objects.create(customer=self.alice, item="A", amount=Decimal("100.00"))
+        today = timezone.localdate(order.order_time)
+
+        response = self.client.patch(
+            reverse('order-update', args=[order.id]),
+            data=json.dumps({'amount': "1,250.00"}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {self.token}'
+        )
+        self.assertEqual(response.json(), {'id': order.id, 'amount': "1250.00"})
+        daily, customers = self.totals()
+        self.assertEqual(daily[today], (1, Decimal("1250.00")))
+        self.assertEqual(customers[self.alice.id], (1, Decimal("1250.00")))
+
+    def test_rebuild_matches_incremental_totals(self):
+        from django.core.management import call_command
+        from io import StringIO
+
+        for i in range(5):
+            Order.objects.create(customer=self.alice if i % 2 else self.bob, item=f"Item {i}", amount=Decimal("10.25"))
+        before = self.totals()
+        DailyRevenue.objects.update(revenue=0)
+
+        call_command('rebuild_revenue_rollups', stdout=StringIO())
+
+        self.assertEqual(self.totals(), before)
+
+    def test_read_api(self):
+        Order.objects.create(customer=self.alice, item="A", amount=Decimal("100.00"))
+        Order.objects.create(customer=self.bob, item="B", amount=Decimal("300.00"))
+        today = timezone.localdate().isoformat()
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('revenue-daily'), {'start': today}, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(response.json(), [{'day': today, 'orders': 2, 'revenue': '400.00'}])
+
+        response = self.client.get(reverse('revenue-customers'), HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual([row['customer_name'] for row in response.json()], ['Bob', 'Alice'])
+        self.assertEqual(response.json()[0]['revenue'], '300.00')
+
+
+class OrderCacheTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.client = Client()
+        self.customer = Customer.objects.create(name="Cached", code="CACHE1", phone="0712345678", email="c@example.com")
+        self.order = Order.objects.create(customer=self.customer, item="Cached Item", amount=Decimal("12.50"))
+        self.token = os.environ.get('ACCESS_TOKEN', '')
+
+    def detail(self):
+        return self.client.get(reverse('order-detail', args=[self.order.id]), HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def test_detail_is_served_from_cache(self):
+        first = self.detail().json()
+        with self.assertNumQueries(0):
+            response = self.detail()
+        self.assertEqual(response.json(), first)
+        self.assertEqual(first['customer_name'], "Cached")
+        self.assertEqual(first['amount'], "12.50")
+
+    def test_writes_invalidate(self):
+        self.detail()
+        self.client.put(
+            reverse('order-update', args=[self.order.id]),
+            data=json.dumps({'amount': "20.00"}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {self.token}'
+        )
+        self.assertEqual(self.detail().json()['amount'], "20.00")
+
+        # Renaming the customer only touches the customer entry
+        self.customer.name = "Renamed"
+        self.customer.save()
+        self.assertEqual(self.detail().json()['customer_name'], "Renamed")
+
+        self.client.delete(reverse('order-delete', args=[self.order.id]), HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(self.detail().status_code, 404)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.client = Client()
+        self.customer = Customer.objects.create(name="Polled", code="POLL1", phone="0712345678", email="p@example.com")
+        self.order = Order.objects.create(customer=self.customer, item="Polled Item", amount=Decimal("5.00"))
+        self.token = os.environ.get('ACCESS_TOKEN', '')
+
+    def get(self, url, etag=None, **params):
+        extra = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(url, params, HTTP_AUTHORIZATION=f'Bearer {self.token}', **extra)
+
+    def test_order_list_not_modified(self):
+        url = reverse('order-list')
+        etag = self.get(url)['ETag']
+
+        # The ETag needs no query and the page is never fetched
+        with self.assertNumQueries(0):
+            response = self.get(url, etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.get(url, etag, page_size=5).status_code, 200)
+
+    def test_order_list_etag_changes_on_writes(self):
+        url = reverse('order-list')
+        etag = self.get(url)['ETag']
+
+        self.customer.name = "Renamed"
+        self.customer.save()
+        response = self.get(url, etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        Order.objects.create(customer=self.customer, item="Another", amount=Decimal("1.00"))
+        response = self.get(url, etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        self.order.delete()
+        self.assertEqual(self.get(url, etag).status_code, 200)
+
+    def test_order_list_etag_changes_on_writes_without_signals(self):
+        url = reverse('order-list')
+        etag = self.get(url)['ETag']
+
+        self.client.patch(
+            reverse('order-update', args=[self.order.id]),
+            data=json.dumps({'item': "Patched"}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {self.token}'
+        )
+        response = self.get(url, etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        self.client.post(
+            reverse('order-bulk-delete'),
+            data=json.dumps({'ids': [self.order.id]}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {self.token}'
+        )
+        self.assertEqual(self.get(url, etag).status_code, 200)
+
+    def test_order_detail_not_modified(self):
+        url = reverse('order-detail', args=[self.order.id])
+        etag = self.get(url)['ETag']
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get(url, etag).status_code, 304)
+
+        self.order.item = "Changed"
+        self.order.save()
+        self.assertEqual(self.get(url, etag).status_code, 200)
+
+    def test_customer_endpoints(self):
+        list_etag = self.get(reverse('customer-list'))['ETag']
+        detail_url = reverse('customer-detail', args=[self.customer.id])
+        detail_etag = self.get(detail_url)['ETag']
+
+        self.assertEqual(self.get(reverse('customer-list'), list_etag).status_code, 304)
+        self.assertEqual(self.get(detail_url, detail_etag).status_code, 304)
+
+        Customer.objects.create(name="New", code="NEW1", phone="0722222222", email="n@example.com")
+        self.assertEqual(self.get(reverse('customer-list'), list_etag).status_code, 200)
+        self.assertEqual(self.get(detail_url, detail_etag).status_code, 304)
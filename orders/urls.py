@@ -4,7 +4,15 @@ from . import views
 urlpatterns = [
     path('', views.order_list, name='order-list'),
     path('<int:pk>/', views.order_detail, name='order-detail'),
+    path('export/', views.order_export, name='order-export'),
     path('create/', views.order_create, name='order-create'),
+    path('bulk-create/', views.order_bulk_create, name='order-bulk-create'),
+    path('bulk-update/', views.order_bulk_update, name='order-bulk-update'),
+    path('bulk-delete/', views.order_bulk_delete, name='order-bulk-delete'),
     path('<int:pk>/update/', views.order_update, name='order-update'),
     path('<int:pk>/delete/', views.order_delete, name='order-delete'),
+    path('revenue/daily/', views.revenue_daily, name='revenue-daily'),
+    path('revenue/customers/', views.revenue_customers, name='revenue-customers'),
+    path('sms/status/', views.sms_status, name='sms-status'),
+    path('sms/delivery-reports/', views.sms_delivery_report, name='sms-delivery-report'),
 ]
\ No newline at end of file
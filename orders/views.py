@@ -1,22 +1,80 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.core.exceptions import ValidationError
 from django.db import transaction
-from .models import Order
+from .models import Order, DailyRevenue, CustomerRevenue
 from customers.models import Customer
-from .sms import send_order_notification
+from .outbox import enqueue_order_notification, enqueue_order_notifications
+from . import bulk, rollups, sms
+from .dispatcher import Dispatcher
+from .delivery_reports import buffer as delivery_report_buffer
+from .idempotency import idempotent
+from .pagination import keyset_page, page_size_from
+from .filters import filter_orders, parse_time
+from .cache import order_cache, order_detail_etag, order_detail_payload
+from .serializers import order_serializer, daily_revenue_serializer, customer_revenue_serializer
+from .export import FORMATS, export_stream
 import json
 from decimal import Decimal
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition
+from sms_service.etags import bump_table_version, make_etag, table_version
+from django.conf import settings
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 from sms_service.auth import requires_auth
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
+def parse_amount(amount):
+    """Parse an order amount, allowing commas as thousand separators."""
+    try:
+        if isinstance(amount, str):
+            amount = amount.replace(',', '')
+        return Decimal(amount)
+    except Exception:
+        raise ValueError('Amount must be a valid number')
+
+def clean_order_field(name, value):
+    """Check value against the Order field `name` (length, digits, finiteness), raising ValueError."""
+    try:
+        return Order._meta.get_field(name).clean(value, None)
+    except ValidationError as e:
+        raise ValueError(f"{name}: {' '.join(e.messages)}")
+
+def order_list_etag(request):
+    # Malformed filters get their 400 from the view, without an ETag
+    try:
+        filter_orders(Order.objects.all(), request.query_params)
+    except ValueError:
+        return None
+    # Customer names are part of the payload, so renames change the ETag too
+    return make_etag('orders', request.get_full_path(), table_version('orders'), table_version('customers'))
+
 @swagger_auto_schema(
     method='get',
-    operation_description="Get a list of all orders",
+    operation_description="Get a page of orders, oldest first. The cursor of the next page is returned "
+                          "in the X-Next-Cursor header (and a Link header) until the last page.",
+    manual_parameters=[
+        openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                          description="Cursor from the previous page's X-Next-Cursor header"),
+        openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                          description="Orders per page (default ORDER_LIST_PAGE_SIZE, at most ORDER_LIST_MAX_PAGE_SIZE)"),
+        openapi.Parameter('customer_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                          description="Only orders for this customer"),
+        openapi.Parameter('start', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                          description="Only orders placed at or after this ISO date/datetime"),
+        openapi.Parameter('end', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                          description="Only orders placed before this ISO datetime, or on or before this date"),
+        openapi.Parameter('min_amount', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                          description="Only orders of at least this amount"),
+        openapi.Parameter('max_amount', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                          description="Only orders of at most this amount"),
+    ],
     responses={
         200: openapi.Response(
             description="Successful operation",
@@ -35,24 +93,79 @@ from rest_framework.response import Response
                 )
             )
         ),
+        400: openapi.Response(description="Invalid cursor, page_size or filter"),
         401: openapi.Response(description="Unauthorized")
     }
 )
 @api_view(['GET'])
 @requires_auth
+@condition(etag_func=order_list_etag)
 def order_list(request):
-    orders = Order.objects.all()
-    data = []
-    for order in orders:
-        data.append({
-            'id': order.id,
-            'customer_id': order.customer.id,
-            'customer_name': order.customer.name,
-            'item': order.item,
-            'amount': str(order.amount),
-            'order_time': order.order_time.isoformat()
-        })
-    return Response(data)
+    try:
+        page_size = page_size_from(request)
+        orders = filter_orders(Order.objects.all(), request.query_params)
+        data, next_cursor = keyset_page(
+            orders, request.query_params.get('cursor'), page_size, serializer=order_serializer
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    
+    response = Response(data)
+    if next_cursor:
+        response['X-Next-Cursor'] = next_cursor
+        # Same filters and page size; only the cursor moves on
+        params = request.query_params.copy()
+        params['cursor'] = next_cursor
+        next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+        response['Link'] = f'<{next_url}>; rel="next"'
+    return response
+
+@swagger_auto_schema(
+    method='get',
+    operation_description="Stream orders as NDJSON or CSV. The response is gzipped when the client "
+                          "sends Accept-Encoding: gzip.",
+    manual_parameters=[
+        openapi.Parameter('output', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(FORMATS),
+                          description="Export format (default ndjson)"),
+        openapi.Parameter('customer_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                          description="Only orders for this customer"),
+        openapi.Parameter('start', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                          description="Only orders placed at or after this ISO date/datetime"),
+        openapi.Parameter('end', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                          description="Only orders placed before this ISO datetime, or on or before this date"),
+        openapi.Parameter('min_amount', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                          description="Only orders of at least this amount"),
+        openapi.Parameter('max_amount', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                          description="Only orders of at most this amount"),
+    ],
+    responses={
+        200: openapi.Response(description="Order export"),
+        400: openapi.Response(description="Invalid output format or filter"),
+        401: openapi.Response(description="Unauthorized")
+    }
+)
+@api_view(['GET'])
+@requires_auth
+def order_export(request):
+    # ?format is taken by DRF's content negotiation
+    output = request.query_params.get('output', 'ndjson')
+    if output not in FORMATS:
+        return Response({'error': f"output must be one of: {', '.join(FORMATS)}"}, status=400)
+    
+    try:
+        orders = filter_orders(Order.objects.all(), request.query_params)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    
+    compress = 'gzip' in request.headers.get('Accept-Encoding', '')
+    content_type, extension, stream = export_stream(orders, output, compress)
+    
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="orders.{extension}"'
+    if compress:
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
 
 @swagger_auto_schema(
     method='get',
@@ -76,21 +189,20 @@ def order_list(request):
 )
 @api_view(['GET'])
 @requires_auth
+@condition(etag_func=order_detail_etag)
 def order_detail(request, pk):
-    order = get_object_or_404(Order, pk=pk)
-    data = {
-        'id': order.id,
-        'customer_id': order.customer.id,
-        'customer_name': order.customer.name,
-        'item': order.item,
-        'amount': str(order.amount),
-        'order_time': order.order_time.isoformat()
-    }
+    data = order_detail_payload(pk)
+    if data is None:
+        raise Http404("No Order matches the given query.")
     return Response(data)
 
 @swagger_auto_schema(
     method='post',
-    operation_description="Create a new order",
+    operation_description="Create a new order. Send an Idempotency-Key header to make retries safe.",
+    manual_parameters=[
+        openapi.Parameter('Idempotency-Key', openapi.IN_HEADER, type=openapi.TYPE_STRING,
+                          description="Unique key per order; a retry with the same key returns the original response"),
+    ],
     request_body=openapi.Schema(
         type=openapi.TYPE_OBJECT,
         required=['customer_id', 'item', 'amount'],
@@ -119,6 +231,7 @@ def order_detail(request, pk):
 )
 @api_view(['POST'])
 @requires_auth
+@idempotent
 def order_create(request):
     if request.method == 'POST':
         data = request.data
@@ -136,11 +249,9 @@ def order_create(request):
             return Response({'error': f"Customer with ID {customer_id} does not exist"}, status=400)
         
         try:
-            if isinstance(amount, str):
-                amount = amount.replace(',', '')
-            amount = Decimal(amount)
-        except:
-            return Response({'error': 'Amount must be a valid number'}, status=400)
+            amount = parse_amount(amount)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
         
         with transaction.atomic():
             order = Order.objects.create(
@@ -149,25 +260,281 @@ def order_create(request):
                 amount=amount
             )
             
-            send_order_notification(
-                customer.phone,
-                customer.name,
-                order.item,
-                str(order.amount)
-            )
+            # Sent by the dispatch_sms worker once this transaction commits
+            enqueue_order_notification(order, customer)
         
-        return Response({
-            'id': order.id,
-            'customer_id': order.customer.id,
-            'customer_name': order.customer.name,
-            'item': order.item,
-            'amount': str(order.amount),
-            'order_time': order.order_time.isoformat()
-        }, status=201)
+        return Response(order_serializer.instance(order), status=201)
 
 @swagger_auto_schema(
-    method='put',
-    operation_description="Update an existing order",
+    method='post',
+    operation_description="Create many orders at once. Valid orders are created in one transaction; "
+                          "invalid ones are reported per item. Returns 201 if every order was created, "
+                          "207 if only some were and 400 if none were.",
+    manual_parameters=[
+        openapi.Parameter('Idempotency-Key', openapi.IN_HEADER, type=openapi.TYPE_STRING,
+                          description="Unique key per batch; a retry with the same key returns the original response"),
+    ],
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=['orders'],
+        properties={
+            'orders': openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    required=['customer_id', 'item', 'amount'],
+                    properties={
+                        'customer_id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'item': openapi.Schema(type=openapi.TYPE_STRING),
+                        'amount': openapi.Schema(type=openapi.TYPE_STRING),
+                    }
+                )
+            ),
+        }
+    ),
+    responses={
+        201: openapi.Response(
+            description="Per-item results",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'created': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    'failed': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    'results': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                'index': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                'status': openapi.Schema(type=openapi.TYPE_STRING, enum=['created', 'error']),
+                                'order': openapi.Schema(
+                                    type=openapi.TYPE_OBJECT,
+                                    properties={
+                                        'id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                        'customer_id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                        'customer_name': openapi.Schema(type=openapi.TYPE_STRING),
+                                        'item': openapi.Schema(type=openapi.TYPE_STRING),
+                                        'amount': openapi.Schema(type=openapi.TYPE_STRING),
+                                        'order_time': openapi.Schema(type=openapi.TYPE_STRING, format='date-time'),
+                                    }
+                                ),
+                                'error': openapi.Schema(type=openapi.TYPE_STRING),
+                            }
+                        )
+                    ),
+                }
+            )
+        ),
+        400: openapi.Response(description="Malformed request or no valid orders")
+    }
+)
+@api_view(['POST'])
+@requires_auth
+@idempotent
+def order_bulk_create(request):
+    items = request.data.get('orders') if isinstance(request.data, dict) else None
+    if not isinstance(items, list) or not items:
+        return Response({'error': 'orders must be a non-empty list'}, status=400)
+    if len(items) > settings.ORDER_BULK_MAX_ITEMS:
+        return Response({'error': f"At most {settings.ORDER_BULK_MAX_ITEMS} orders per request"}, status=400)
+    
+    results = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = {'index': index, 'status': 'error', 'error': 'Order must be an object'}
+            continue
+        if not all([item.get('customer_id'), item.get('item'), item.get('amount')]):
+            results[index] = {'index': index, 'status': 'error', 'error': 'All fields are required'}
+            continue
+        try:
+            customer_id = int(item['customer_id'])
+        except (TypeError, ValueError):
+            results[index] = {'index': index, 'status': 'error', 'error': 'customer_id must be an integer'}
+            continue
+        try:
+            # Checked here so one bad value fails its item, not the INSERT
+            amount = clean_order_field('amount', parse_amount(item['amount']))
+            name = clean_order_field('item', str(item['item']))
+        except ValueError as e:
+            results[index] = {'index': index, 'status': 'error', 'error': str(e)}
+            continue
+        valid.append((index, customer_id, name, amount))
+    
+    # One IN query for every customer in the batch
+    customers = Customer.objects.in_bulk({customer_id for _, customer_id, _, _ in valid})
+    
+    orders = []
+    indexes = []
+    for index, customer_id, item, amount in valid:
+        customer = customers.get(customer_id)
+        if customer is None:
+            results[index] = {'index': index, 'status': 'error', 'error': f"Customer with ID {customer_id} does not exist"}
+            continue
+        orders.append(Order(customer=customer, item=item, amount=amount))
+        indexes.append(index)
+    
+    if orders:
+        with transaction.atomic():
+            Order.objects.bulk_create(orders, batch_size=settings.ORDER_BULK_BATCH_SIZE)
+            rollups.record_created(orders)
+            bump_table_version('orders')
+            # Sent by the dispatch_sms worker once this transaction commits
+            enqueue_order_notifications(orders)
+    
+    for index, order in zip(indexes, orders):
+        results[index] = {'index': index, 'status': 'created', 'order': order_serializer.instance(order)}
+    
+    created = len(orders)
+    failed = len(items) - created
+    if not created:
+        status = 400
+    elif failed:
+        status = 207
+    else:
+        status = 201
+    return Response({'created': created, 'failed': failed, 'results': results}, status=status)
+
+@swagger_auto_schema(
+    method='post',
+    operation_description="Change the item and/or amount of many orders, given by 'ids' or by a 'filter' (at most ORDER_BULK_WRITE_MAX_ITEMS orders)",
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=['changes'],
+        properties={
+            'ids': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+            'filter': openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                description="Order list filters: customer_id, start, end, min_amount, max_amount",
+            ),
+            'changes': openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'item': openapi.Schema(type=openapi.TYPE_STRING),
+                    'amount': openapi.Schema(type=openapi.TYPE_STRING),
+                }
+            ),
+        }
+    ),
+    responses={
+        200: openapi.Response(
+            description="Orders updated",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'matched': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    'updated': openapi.Schema(type=openapi.TYPE_INTEGER),
+                }
+            )
+        ),
+        400: openapi.Response(description="Malformed request or too many orders")
+    }
+)
+@api_view(['POST'])
+@requires_auth
+def order_bulk_update(request):
+    data = request.data
+    if not isinstance(data, dict):
+        return Response({'error': 'Request body must be an object'}, status=400)
+    requested = data.get('changes')
+    if not isinstance(requested, dict):
+        return Response({'error': "'changes' must be an object"}, status=400)
+
+    changes = {}
+    try:
+        # Checked against the columns, as in order_bulk_create
+        if requested.get('item'):
+            if not isinstance(requested['item'], str):
+                raise ValueError('item must be a string')
+            changes['item'] = clean_order_field('item', requested['item'])
+        if requested.get('amount'):
+            changes['amount'] = clean_order_field('amount', parse_amount(requested['amount']))
+        if not changes:
+            raise ValueError("'changes' must set item or amount")
+        ids = bulk.target_ids(data)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+
+    updated = bulk.update_orders(ids, changes)
+    return Response({'matched': len(ids), 'updated': updated})
+
+@swagger_auto_schema(
+    method='post',
+    operation_description="Delete many orders, given by 'ids' or by a 'filter' (at most ORDER_BULK_WRITE_MAX_ITEMS orders)",
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'ids': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+            'filter': openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                description="Order list filters: customer_id, start, end, min_amount, max_amount",
+            ),
+        }
+    ),
+    responses={
+        200: openapi.Response(
+            description="Orders deleted",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'matched': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    'deleted': openapi.Schema(type=openapi.TYPE_INTEGER),
+                }
+            )
+        ),
+        400: openapi.Response(description="Malformed request or too many orders")
+    }
+)
+@api_view(['POST'])
+@requires_auth
+def order_bulk_delete(request):
+    if not isinstance(request.data, dict):
+        return Response({'error': 'Request body must be an object'}, status=400)
+    try:
+        ids = bulk.target_ids(request.data)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+
+    deleted = bulk.delete_orders(ids)
+    return Response({'matched': len(ids), 'deleted': deleted})
+
+def update_order(pk, changes):
+    """
+    Write changes to order pk with one UPDATE of just those columns.
+
+    Returns False if there is no such order. QuerySet.update() skips the
+    order signals, so the cache entry is dropped here, and an amount
+    change moves the order's share of the revenue rollups. That needs the
+    old amount, which is read under a row lock so a concurrent edit cannot
+    change it between the read and the UPDATE.
+    """
+    if 'amount' not in changes:
+        if not Order.objects.filter(pk=pk).update(**changes, last_modified=timezone.now()):
+            return False
+        order_cache.invalidate(pk)
+        bump_table_version('orders')
+        return True
+
+    with transaction.atomic():
+        old = (
+            Order.objects.select_for_update()
+            .filter(pk=pk)
+            .values_list('order_time', 'customer_id', 'amount')
+            .first()
+        )
+        if old is None:
+            return False
+        Order.objects.filter(pk=pk).update(**changes, last_modified=timezone.now())
+        order_time, customer_id, amount = old
+        day = timezone.localdate(order_time)
+        rollups.move([(day, customer_id, amount)], [(day, customer_id, changes['amount'])])
+        order_cache.invalidate(pk)
+        bump_table_version('orders')
+    return True
+
+@swagger_auto_schema(
+    methods=['put', 'patch'],
+    operation_description="Update an existing order. PUT responds with the full order; PATCH responds with the id and the fields that changed",
     request_body=openapi.Schema(
         type=openapi.TYPE_OBJECT,
         properties={
@@ -190,41 +557,37 @@ def order_create(request):
                 }
             )
         ),
-        
+        400: openapi.Response(description="Invalid amount"),
+        404: openapi.Response(description="Order not found"),
     }
 )
-@api_view(['PUT'])
+@api_view(['PUT', 'PATCH'])
 @requires_auth
 def order_update(request, pk):
-    order = get_object_or_404(Order, pk=pk)
-    
-    if request.method == 'PUT':
-        data = request.data
-        
-        item = data.get('item')
-        amount = data.get('amount')
-        
-        if item:
-            order.item = item
-        
-        if amount:
-            try:
-                if isinstance(amount, str):
-                    amount = amount.replace(',', '')
-                order.amount = Decimal(amount)
-            except:
-                return Response({'error': 'Amount must be a valid number'}, status=400)
-        
-        order.save()
-        
-        return Response({
-            'id': order.id,
-            'customer_id': order.customer.id,
-            'customer_name': order.customer.name,
-            'item': order.item,
-            'amount': str(order.amount),
-            'order_time': order.order_time.isoformat()
-        })
+    data = request.data
+    changes = {}
+
+    if data.get('item'):
+        changes['item'] = data['item']
+
+    if data.get('amount'):
+        try:
+            changes['amount'] = parse_amount(data['amount'])
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+    if changes and not update_order(pk, changes):
+        raise Http404('Order not found')
+
+    if request.method == 'PATCH':
+        if not changes and not Order.objects.filter(pk=pk).exists():
+            raise Http404('Order not found')
+        return Response({'id': pk, **changes})
+
+    order = order_serializer.one(Order.objects.filter(pk=pk))
+    if order is None:
+        raise Http404('Order not found')
+    return Response(order)
 
 @swagger_auto_schema(
     method='delete',
@@ -243,4 +606,168 @@ def order_delete(request, pk):
     
     if request.method == 'DELETE':
         order.delete()
-        return Response(status=204)
\ No newline at end of file
+        return Response(status=204)
+
+@swagger_auto_schema(
+    method='get',
+    operation_description="Get the state of the SMS gateway circuit breaker and the outbox",
+    responses={
+        200: openapi.Response(
+            description="Successful operation",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'state': openapi.Schema(type=openapi.TYPE_STRING, enum=['closed', 'open', 'half_open']),
+                    'failure_rate': openapi.Schema(type=openapi.TYPE_NUMBER),
+                    'recent_calls': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    'rejected': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    'retry_in': openapi.Schema(type=openapi.TYPE_NUMBER, x_nullable=True),
+                    'queue_depth': openapi.Schema(type=openapi.TYPE_INTEGER),
+                }
+            )
+        ),
+        401: openapi.Response(description="Unauthorized")
+    }
+)
+@api_view(['GET'])
+@requires_auth
+def sms_status(request):
+    data = sms.breaker.stats()
+    data['queue_depth'] = Dispatcher.queue_depth()
+    return Response(data)
+
+
+@swagger_auto_schema(
+    method='post',
+    operation_description="Delivery report callback from Africa's Talking (form encoded)",
+    manual_parameters=[
+        openapi.Parameter('token', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                          description="Shared secret, required when SMS_DELIVERY_REPORT_TOKEN is set"),
+    ],
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=['id', 'status'],
+        properties={
+            'id': openapi.Schema(type=openapi.TYPE_STRING),
+            'status': openapi.Schema(type=openapi.TYPE_STRING),
+            'phoneNumber': openapi.Schema(type=openapi.TYPE_STRING),
+            'networkCode': openapi.Schema(type=openapi.TYPE_STRING),
+            'failureReason': openapi.Schema(type=openapi.TYPE_STRING),
+            'retryCount': openapi.Schema(type=openapi.TYPE_INTEGER),
+        }
+    ),
+    responses={
+        200: openapi.Response(description="Report accepted"),
+        400: openapi.Response(description="Missing id or status"),
+        403: openapi.Response(description="Invalid token, or SMS_DELIVERY_REPORT_TOKEN is not set")
+    }
+)
+@api_view(['POST'])
+@csrf_exempt
+def sms_delivery_report(request):
+    # Africa's Talking cannot send our bearer token, so callbacks are
+    # authenticated with a shared secret in the callback URL. Without one
+    # configured the endpoint stays closed.
+    expected_token = settings.SMS_DELIVERY_REPORT_TOKEN
+    if not expected_token:
+        return Response({'error': 'Delivery reports are disabled until SMS_DELIVERY_REPORT_TOKEN is set'}, status=403)
+    if not constant_time_compare(request.GET.get('token', ''), expected_token):
+        return Response({'error': 'Invalid token'}, status=403)
+    
+    data = request.data
+    if not data.get('id') or not data.get('status'):
+        return Response({'error': 'id and status are required'}, status=400)
+    
+    delivery_report_buffer.add({
+        'id': data.get('id'),
+        'status': data.get('status'),
+        'phoneNumber': data.get('phoneNumber', ''),
+        'networkCode': data.get('networkCode', ''),
+        'failureReason': data.get('failureReason', ''),
+    })
+    return Response({'status': 'accepted'})
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_description="Order count and revenue per day, from the revenue rollups",
+    manual_parameters=[
+        openapi.Parameter('start', openapi.IN_QUERY, type=openapi.TYPE_STRING, format='date',
+                          description="First day to include (YYYY-MM-DD)"),
+        openapi.Parameter('end', openapi.IN_QUERY, type=openapi.TYPE_STRING, format='date',
+                          description="Last day to include (YYYY-MM-DD)"),
+    ],
+    responses={
+        200: openapi.Response(
+            description="Successful operation",
+            schema=openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'day': openapi.Schema(type=openapi.TYPE_STRING, format='date'),
+                        'orders': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'revenue': openapi.Schema(type=openapi.TYPE_STRING),
+                    }
+                )
+            )
+        ),
+        400: openapi.Response(description="Invalid date"),
+        401: openapi.Response(description="Unauthorized")
+    }
+)
+@api_view(['GET'])
+@requires_auth
+def revenue_daily(request):
+    days = DailyRevenue.objects.filter(order_count__gt=0).order_by('day')
+    try:
+        if request.query_params.get('start'):
+            days = days.filter(day__gte=parse_time(request.query_params['start']).date())
+        if request.query_params.get('end'):
+            days = days.filter(day__lte=parse_time(request.query_params['end']).date())
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    
+    return Response(daily_revenue_serializer.rows(days))
+
+@swagger_auto_schema(
+    method='get',
+    operation_description="Customers with the highest revenue, from the revenue rollups",
+    manual_parameters=[
+        openapi.Parameter('customer_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                          description="Only this customer"),
+        openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                          description="Number of customers (default ORDER_LIST_PAGE_SIZE, at most ORDER_LIST_MAX_PAGE_SIZE)"),
+    ],
+    responses={
+        200: openapi.Response(
+            description="Successful operation",
+            schema=openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'customer_id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'customer_name': openapi.Schema(type=openapi.TYPE_STRING),
+                        'orders': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'revenue': openapi.Schema(type=openapi.TYPE_STRING),
+                    }
+                )
+            )
+        ),
+        400: openapi.Response(description="Invalid customer_id or page_size"),
+        401: openapi.Response(description="Unauthorized")
+    }
+)
+@api_view(['GET'])
+@requires_auth
+def revenue_customers(request):
+    totals = CustomerRevenue.objects.filter(order_count__gt=0).order_by('-revenue', 'customer_id')
+    try:
+        page_size = page_size_from(request)
+        if request.query_params.get('customer_id'):
+            totals = totals.filter(customer_id=int(request.query_params['customer_id']))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    
+    return Response(customer_revenue_serializer.rows(totals[:page_size]))
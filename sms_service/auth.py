@@ -1,15 +1,13 @@
 import jwt 
-import requests
 import sys
 from functools import wraps
 from django.http import JsonResponse
 from django.conf import settings
 import os
 import json
-from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicNumbers
-from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import serialization
-import base64
+from .jwks import jwks_cache, jwk_to_public_key, base64_to_int
+from .token_cache import verified_tokens
 
 def is_test_environment():
     return 'test' in sys.argv
@@ -43,28 +41,23 @@ def requires_auth(f):
             return JsonResponse({"error": "Authorization header is missing"}, status=401)
             
         try:
-            jwks_url = f"https://{settings.AUTH0_DOMAIN}/.well-known/jwks.json"
-            jwks_response = requests.get(jwks_url)
-            jwks = jwks_response.json()
-            
-            header = jwt.get_unverified_header(token)
-            
-            rsa_key = None
-            for key in jwks['keys']:
-                if key['kid'] == header['kid']:
-                    rsa_key = jwk_to_pem(key)
-                    break
-            
-            if not rsa_key:
-                return JsonResponse({"error": "Key not found"}, status=401)
+            payload = verified_tokens.get(token)
+            if payload is None:
+                header = jwt.get_unverified_header(token)
                 
-            payload = jwt.decode(
-                token,
-                rsa_key,
-                algorithms=['RS256'],
-                audience=settings.API_IDENTIFIER,
-                issuer=f"https://{settings.AUTH0_DOMAIN}/"
-            )
+                rsa_key = jwks_cache.get_key(header.get('kid'))
+                
+                if not rsa_key:
+                    return JsonResponse({"error": "Key not found"}, status=401)
+                    
+                payload = jwt.decode(
+                    token,
+                    rsa_key,
+                    algorithms=['RS256'],
+                    audience=settings.API_IDENTIFIER,
+                    issuer=f"https://{settings.AUTH0_DOMAIN}/"
+                )
+                verified_tokens.set(token, payload, header.get('kid'))
             
             return f(request, *args, **kwargs)
             
@@ -79,23 +72,9 @@ def requires_auth(f):
 
 def jwk_to_pem(jwk):
     """Convert a JWK key to PEM format"""
-    modulus = base64_to_int(jwk['n'])
-    exponent = base64_to_int(jwk['e'])
-    
-    public_numbers = RSAPublicNumbers(exponent, modulus)
-    
-    public_key = public_numbers.public_key(default_backend())
+    public_key = jwk_to_public_key(jwk)
     
     return public_key.public_bytes(
         encoding=serialization.Encoding.PEM,
         format=serialization.PublicFormat.SubjectPublicKeyInfo
     )
-
-def base64_to_int(value):
-    """Convert base64 URL encoded value to integer"""
-    value += '=' * (4 - len(value) % 4)
-    
-    value = value.replace('-', '+').replace('_', '/')
-    
-    decoded = base64.b64decode(value)
-    return int.from_bytes(decoded, byteorder='big')
\ No newline at end of file
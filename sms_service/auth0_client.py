@@ -0,0 +1,70 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Return the process-wide keep-alive session used for every Auth0 call.
+
+    The session is rebuilt after a fork so gunicorn workers never share
+    pooled sockets with their parent.
+    """
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        with _session_lock:
+            if _session is None or _session_pid != os.getpid():
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=settings.AUTH0_HTTP_POOL_SIZE,
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+                _session_pid = os.getpid()
+    return _session
+
+
+def get_timeout():
+    return (settings.AUTH0_HTTP_CONNECT_TIMEOUT, settings.AUTH0_HTTP_READ_TIMEOUT)
+
+
+def get(url, **kwargs):
+    kwargs.setdefault('timeout', get_timeout())
+    return get_session().get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    kwargs.setdefault('timeout', get_timeout())
+    return get_session().post(url, **kwargs)
+
+
+def stats():
+    """Report how many requests were served and how many connections were opened."""
+    requests_made = 0
+    connections_opened = 0
+    if _session is not None:
+        for adapter in set(_session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                requests_made += pool.num_requests
+                connections_opened += pool.num_connections
+
+    reused = max(requests_made - connections_opened, 0)
+    return {
+        'requests': requests_made,
+        'connections_opened': connections_opened,
+        'connections_reused': reused,
+        'reuse_ratio': reused / requests_made if requests_made else 0.0,
+    }
@@ -1,9 +1,12 @@
+import os
+import random
 import time
-import requests
 import threading
 import sys
 from django.conf import settings
 from django.http import JsonResponse
+from . import auth0_client
+from .token_store import get_token_store
 
 def is_test_environment():
     return 'test' in sys.argv
@@ -15,11 +18,19 @@ class Auth0TokenMiddleware:
     This middleware handles token acquisition, caching, and refreshing
     for machine-to-machine communications using the OAuth2 client
     credentials flow.
+
+    The token lives in the store configured by AUTH0_TOKEN_STORE, so
+    workers can share it, and is mirrored in class attributes to keep
+    the per-request check free of I/O. Once a token exists, a background
+    thread renews it at AUTH0_TOKEN_REFRESH_FRACTION of its lifetime,
+    so requests only wait on Auth0 when there is no valid token at all.
     """
     
     _token = None
     _token_expiry = 0
+    _token_refresh_at = 0
     _token_lock = threading.RLock()  
+    _refresher_pid = None
     
     def __init__(self, get_response):
         self.get_response = get_response
@@ -48,20 +59,129 @@ class Auth0TokenMiddleware:
     @classmethod
     def _get_valid_token(cls):
         """Get a valid token, refreshing if necessary."""
-        with cls._token_lock:
-            current_time = time.time()
-            
-            if cls._token and current_time < cls._token_expiry - 30:
-                return cls._token
-                
-            token_data = cls._fetch_new_token()
-            if not token_data:
-                return None
-                
-            cls._token = token_data.get('access_token')
-            cls._token_expiry = current_time + token_data.get('expires_in', 86400)
-            
+        if cls._token and time.time() < cls._token_expiry - 30:
             return cls._token
+
+        try:
+            return cls.get_token_data()['access_token']
+        except Exception as e:
+            print(f"Error fetching token: {str(e)}")
+            return None
+
+    @classmethod
+    def get_token_data(cls):
+        """
+        Return the current token data, fetching a new token if needed.
+
+        Concurrent callers are coalesced into a single Auth0 request.
+        Raises if no token could be obtained.
+        """
+        with cls._token_lock:
+            if cls._token and time.time() < cls._token_expiry - 30:
+                return {'access_token': cls._token, 'expires_at': cls._token_expiry}
+
+            store = get_token_store()
+            token_data = store.get()
+
+            if not cls._is_fresh(token_data):
+                # Only one process refreshes; the others pick up its token
+                with store.lock():
+                    token_data = store.get()
+                    if not cls._is_fresh(token_data):
+                        token_data = cls._refresh_token(store)
+                        if not token_data:
+                            raise ValueError("Auth0 returned no access token")
+
+            cls._set_token(token_data)
+
+        cls._ensure_refresher()
+        return token_data
+
+    @classmethod
+    def _set_token(cls, token_data):
+        cls._token = token_data['access_token']
+        cls._token_expiry = token_data['expires_at']
+        cls._token_refresh_at = token_data.get('refresh_at', token_data['expires_at'] - 30)
+
+    @staticmethod
+    def _is_fresh(token_data):
+        return bool(token_data) and time.time() < token_data['expires_at'] - 30
+
+    @classmethod
+    def _refresh_token(cls, store):
+        """Fetch a new token and publish it to the shared store."""
+        current_time = time.time()
+        token_data = cls._fetch_new_token()
+        if not token_data or not token_data.get('access_token'):
+            return None
+
+        expires_in = token_data.get('expires_in', 86400)
+        token_data = {
+            'access_token': token_data['access_token'],
+            'expires_at': current_time + expires_in,
+            'refresh_at': current_time + expires_in * settings.AUTH0_TOKEN_REFRESH_FRACTION,
+        }
+        store.set(token_data)
+        return token_data
+
+    @classmethod
+    def _ensure_refresher(cls):
+        """Start the background refresh thread once per process."""
+        if not settings.AUTH0_TOKEN_BACKGROUND_REFRESH or is_test_environment():
+            return
+        if cls._refresher_pid == os.getpid():
+            return
+        with cls._token_lock:
+            if cls._refresher_pid != os.getpid():
+                cls._refresher_pid = os.getpid()
+                threading.Thread(target=cls._refresh_loop, name='auth0-token-refresher', daemon=True).start()
+
+    @classmethod
+    def _refresh_loop(cls):
+        failures = 0
+        while True:
+            if failures:
+                delay = cls._retry_delay(failures)
+            else:
+                delay = cls._token_refresh_at - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+            try:
+                refreshed = cls._refresh_in_background()
+            except Exception as e:
+                print(f"Error refreshing token: {str(e)}")
+                refreshed = False
+            failures = 0 if refreshed else failures + 1
+
+    @staticmethod
+    def _retry_delay(failures):
+        """Exponential backoff with full jitter."""
+        ceiling = min(
+            settings.AUTH0_TOKEN_REFRESH_RETRY_MAX,
+            settings.AUTH0_TOKEN_REFRESH_RETRY_BASE * 2 ** (failures - 1),
+        )
+        return random.uniform(0, ceiling)
+
+    @classmethod
+    def _refresh_in_background(cls):
+        """
+        Renew the token without holding the request-path lock.
+
+        Requests keep using the current token while this runs. If another
+        worker already renewed it, its token is adopted instead.
+        """
+        store = get_token_store()
+        with store.lock():
+            token_data = store.get()
+            if not (token_data and time.time() < token_data.get('refresh_at', 0)):
+                token_data = cls._refresh_token(store)
+                if not token_data:
+                    return False
+
+        with cls._token_lock:
+            cls._set_token(token_data)
+        return True
     
     @staticmethod
     def _fetch_new_token():
@@ -77,10 +197,6 @@ class Auth0TokenMiddleware:
         
         headers = {"content-type": "application/json"}
         
-        try:
-            response = requests.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching token: {str(e)}")
-            return None
\ No newline at end of file
+        response = auth0_client.post(url, json=payload, headers=headers)
+        response.raise_for_status()
+        return response.json()
\ No newline at end of file
@@ -0,0 +1,58 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+def _cache():
+    return caches[settings.OBJECT_CACHE_ALIAS]
+
+
+def _key(table):
+    return f"etags:version:{table}"
+
+
+def table_version(table):
+    """
+    A counter that changes whenever a row of `table` is added, changed or removed.
+
+    Kept in the OBJECT_CACHE_ALIAS cache, so reading it costs no query.
+    A missing counter (first use, eviction, cache restart) starts from the
+    current time in nanoseconds rather than zero, so it never repeats a
+    value an old ETag was built from.
+    """
+    cache = _cache()
+    version = cache.get(_key(table))
+    if version is None:
+        cache.add(_key(table), time.time_ns(), None)
+        version = cache.get(_key(table))
+    return version
+
+
+def bump_table_version(*tables):
+    """
+    Change the version of each of `tables`.
+
+    Called by every write path, including QuerySet.update() and other
+    writes that skip model signals. Inside a transaction the versions
+    are bumped again once it commits, so a reader cannot tag the old rows
+    with the new version in between.
+    """
+    def bump():
+        cache = _cache()
+        for table in tables:
+            try:
+                cache.incr(_key(table))
+            except ValueError:
+                cache.set(_key(table), time.time_ns(), None)
+
+    bump()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(bump)
+
+
+def make_etag(*parts):
+    """Strong ETag for a response determined by `parts`."""
+    return hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
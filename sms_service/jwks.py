@@ -0,0 +1,137 @@
+import base64
+import re
+import threading
+import time
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicNumbers
+from django.conf import settings
+
+from . import auth0_client
+
+MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+def get_jwks_url():
+    return f"https://{settings.AUTH0_DOMAIN}/.well-known/jwks.json"
+
+
+def base64_to_int(value):
+    """Convert base64 URL encoded value to integer"""
+    value += '=' * (4 - len(value) % 4)
+    
+    value = value.replace('-', '+').replace('_', '/')
+    
+    decoded = base64.b64decode(value)
+    return int.from_bytes(decoded, byteorder='big')
+
+
+def jwk_to_public_key(jwk):
+    """Convert an RSA JWK to a cryptography public key object"""
+    public_numbers = RSAPublicNumbers(base64_to_int(jwk['e']), base64_to_int(jwk['n']))
+    return public_numbers.public_key(default_backend())
+
+
+def build_key_registry(jwks):
+    """Map each usable RSA key in a JWKS document to its parsed public key."""
+    registry = {}
+    for jwk in jwks.get('keys', []):
+        if jwk.get('kty', 'RSA') != 'RSA' or 'kid' not in jwk:
+            continue
+        try:
+            registry[jwk['kid']] = jwk_to_public_key(jwk)
+        except (KeyError, ValueError) as e:
+            print(f"Skipping JWK {jwk['kid']}: {str(e)}")
+    return registry
+
+
+class JWKSCache:
+    """
+    Process-wide cache of the Auth0 JSON Web Key Set.
+
+    Keys are parsed into public key objects once, when the key set is
+    loaded, so they can be handed straight to jwt.decode.
+
+    Keys are served from memory until the TTL runs out (the lower of
+    AUTH0_JWKS_CACHE_TTL and the Cache-Control max-age sent by Auth0).
+    A token carrying an unknown kid triggers a refetch, but only one
+    thread fetches at a time and refetches are throttled by
+    AUTH0_JWKS_MIN_REFRESH_INTERVAL. Expired keys keep being served
+    while a single thread revalidates them, and also when Auth0 cannot
+    be reached.
+    """
+
+    def __init__(self):
+        self._keys = {}
+        self._fetched_at = 0
+        self._expires_at = 0
+        self._lock = threading.Lock()
+        self._rotation_listeners = []
+
+    def add_rotation_listener(self, callback):
+        """Call callback(kids) whenever keys drop out of the key set."""
+        self._rotation_listeners.append(callback)
+
+    def get_key(self, kid):
+        """Return the public key for kid, fetching the key set only when needed."""
+        key = self._keys.get(kid)
+        if key is not None:
+            # Known kid: serve it even if stale and let one thread revalidate
+            if time.time() >= self._expires_at and self._lock.acquire(blocking=False):
+                try:
+                    if time.time() >= self._expires_at:
+                        self._refresh()
+                finally:
+                    self._lock.release()
+                key = self._keys.get(kid)
+            return key
+
+        with self._lock:
+            # Another thread may have fetched the kid while we waited
+            key = self._keys.get(kid)
+            if key is None and time.time() - self._fetched_at >= settings.AUTH0_JWKS_MIN_REFRESH_INTERVAL:
+                self._refresh()
+                key = self._keys.get(kid)
+            return key
+
+    def clear(self):
+        with self._lock:
+            self._keys = {}
+            self._fetched_at = 0
+            self._expires_at = 0
+
+    def _refresh(self):
+        """Fetch the key set, keeping the previous one if Auth0 is unreachable."""
+        now = time.time()
+        try:
+            response = auth0_client.get(get_jwks_url())
+            response.raise_for_status()
+            jwks = response.json()
+        except Exception as e:
+            print(f"Error fetching JWKS: {str(e)}")
+            # Serve stale keys, and back off before trying again
+            self._fetched_at = now
+            if self._keys:
+                self._expires_at = now + settings.AUTH0_JWKS_MIN_REFRESH_INTERVAL
+            return
+
+        keys = build_key_registry(jwks)
+        removed = set(self._keys) - set(keys)
+        self._keys = keys
+        self._fetched_at = now
+        self._expires_at = now + self._get_ttl(response)
+
+        if removed:
+            for callback in self._rotation_listeners:
+                callback(removed)
+
+    @staticmethod
+    def _get_ttl(response):
+        ttl = settings.AUTH0_JWKS_CACHE_TTL
+        match = MAX_AGE_RE.search(response.headers.get('Cache-Control', ''))
+        if match:
+            ttl = min(ttl, int(match.group(1)))
+        return max(ttl, settings.AUTH0_JWKS_MIN_REFRESH_INTERVAL)
+
+
+jwks_cache = JWKSCache()
@@ -0,0 +1,89 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+class ObjectCache:
+    """
+    Read-through cache of serialized objects keyed by primary key.
+
+    get() returns the cached payload or calls `load(pk)` and stores what
+    it returns; a None result (missing object) is not cached. Entries
+    live in the Django cache named by OBJECT_CACHE_ALIAS for
+    OBJECT_CACHE_TIMEOUT seconds and are dropped by invalidate(), which
+    the apps call from post_save/post_delete handlers. Hit and miss
+    counters are per process.
+    """
+
+    def __init__(self, name, load):
+        self.name = name
+        self.load = load
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def cache(self):
+        return caches[settings.OBJECT_CACHE_ALIAS]
+
+    def key(self, pk):
+        return f"objects:{self.name}:{pk}"
+
+    def get(self, pk):
+        payload = self.cache.get(self.key(pk))
+        if payload is not None:
+            self._count(hits=1)
+            return payload
+
+        self._count(misses=1)
+        payload = self.load(pk)
+        if payload is not None:
+            self.cache.set(self.key(pk), payload, settings.OBJECT_CACHE_TIMEOUT)
+        return payload
+
+    def invalidate(self, *pks):
+        """
+        Drop the entries for pks.
+
+        Inside a transaction they are dropped again once it commits, so a
+        reader cannot re-cache the old row in between.
+        """
+        if not pks:
+            return
+        keys = [self.key(pk) for pk in pks]
+        self.cache.delete_many(keys)
+        self._count(invalidations=len(keys))
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: self.cache.delete_many(keys))
+
+    def _count(self, hits=0, misses=0, invalidations=0):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.invalidations += invalidations
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
+
+
+_registry = {}
+
+
+def register(name, load):
+    """Create the cache for one kind of object and make it visible in cache_stats()."""
+    _registry[name] = ObjectCache(name, load)
+    return _registry[name]
+
+
+def cache_stats():
+    return {name: object_cache.stats() for name, object_cache in _registry.items()}
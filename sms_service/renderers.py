@@ -0,0 +1,16 @@
+from rest_framework.renderers import BaseRenderer
+
+from . import serialization
+
+
+class ORJSONRenderer(BaseRenderer):
+    """JSON renderer backed by orjson; see sms_service.serialization.dumps."""
+
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return serialization.dumps(data)
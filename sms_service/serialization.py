@@ -0,0 +1,62 @@
+from decimal import Decimal
+from operator import attrgetter
+
+import orjson
+
+
+def _default(obj):
+    # orjson handles datetimes natively; amounts are sent as strings
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(data):
+    """Encode data as JSON bytes. Datetimes become ISO 8601 and Decimals strings."""
+    return orjson.dumps(data, default=_default)
+
+
+def loads(content):
+    return orjson.loads(content)
+
+
+def to_json(data):
+    """Plain JSON-compatible copy of data, e.g. for a JSONField."""
+    return orjson.loads(dumps(data))
+
+
+class RowSerializer:
+    """
+    Turns querysets into response dicts without building model instances.
+
+    `fields` maps output names to ORM lookups. Rows are fetched as tuples
+    with values_list() and zipped with the output names; values are left
+    as they come from the database (Decimal, datetime) for the renderer to
+    encode, so there is no per-field conversion in Python.
+    """
+
+    def __init__(self, **fields):
+        self.names = tuple(fields)
+        self.lookups = tuple(fields.values())
+        self._getters = [attrgetter(lookup.replace('__', '.')) for lookup in self.lookups]
+
+    def values_list(self, queryset):
+        return queryset.values_list(*self.lookups)
+
+    def rows(self, queryset):
+        names = self.names
+        return [dict(zip(names, row)) for row in self.values_list(queryset)]
+
+    def iter_rows(self, queryset, chunk_size):
+        names = self.names
+        for row in self.values_list(queryset).iterator(chunk_size=chunk_size):
+            yield dict(zip(names, row))
+
+    def one(self, queryset):
+        """The first row of queryset, or None."""
+        row = self.values_list(queryset).first()
+        return dict(zip(self.names, row)) if row is not None else None
+
+    def instance(self, obj):
+        """Serialize a model instance that is already loaded."""
+        return {name: getter(obj) for name, getter in zip(self.names, self._getters)}
@@ -64,10 +64,54 @@ LOGIN_REDIRECT_URL = os.environ.get('LOGIN_REDIRECT_URL', '/api/customers/')
 LOGOUT_REDIRECT_URL = os.environ.get('LOGOUT_REDIRECT_URL', '/api/customers/')
 LOGIN_URL = os.environ.get('LOGIN_URL', '/oidc/authenticate/')
 API_IDENTIFIER = os.environ.get('API_IDENTIFIER', f"https://{AUTH0_DOMAIN}/api/v2/")
-
+AUTH0_JWKS_CACHE_TTL = int(os.environ.get('AUTH0_JWKS_CACHE_TTL', '600'))
+AUTH0_JWKS_MIN_REFRESH_INTERVAL = int(os.environ.get('AUTH0_JWKS_MIN_REFRESH_INTERVAL', '30'))
+AUTH0_VERIFIED_TOKEN_CACHE_SIZE = int(os.environ.get('AUTH0_VERIFIED_TOKEN_CACHE_SIZE', '1024'))
+AUTH0_HTTP_POOL_SIZE = int(os.environ.get('AUTH0_HTTP_POOL_SIZE', '10'))
+AUTH0_HTTP_CONNECT_TIMEOUT = float(os.environ.get('AUTH0_HTTP_CONNECT_TIMEOUT', '3.05'))
+AUTH0_HTTP_READ_TIMEOUT = float(os.environ.get('AUTH0_HTTP_READ_TIMEOUT', '10'))
+
+PHONE_DEFAULT_COUNTRY_CODE = os.environ.get('PHONE_DEFAULT_COUNTRY_CODE', '254')
 AT_USERNAME = os.environ.get('AT_USERNAME', 'sandbox')
 AT_API_KEY = os.environ.get('AT_API_KEY', '')
+SMS_BACKEND = os.environ.get('SMS_BACKEND', 'orders.sms_backends.AfricasTalkingBackend')
+SMS_HTTP_GATEWAY_URL = os.environ.get('SMS_HTTP_GATEWAY_URL', 'http://127.0.0.1:8025/version1/messaging')
+SMS_HTTP_CONNECT_TIMEOUT = float(os.environ.get('SMS_HTTP_CONNECT_TIMEOUT', '3.05'))
+SMS_HTTP_TIMEOUT = float(os.environ.get('SMS_HTTP_TIMEOUT', '10'))
+SMS_BROADCAST_CHUNK_SIZE = int(os.environ.get('SMS_BROADCAST_CHUNK_SIZE', '500'))
+SMS_BROADCAST_RECIPIENTS_PER_CALL = int(os.environ.get('SMS_BROADCAST_RECIPIENTS_PER_CALL', '100'))
+ORDER_LIST_PAGE_SIZE = int(os.environ.get('ORDER_LIST_PAGE_SIZE', '100'))
+ORDER_LIST_MAX_PAGE_SIZE = int(os.environ.get('ORDER_LIST_MAX_PAGE_SIZE', '1000'))
+ORDER_EXPORT_CHUNK_SIZE = int(os.environ.get('ORDER_EXPORT_CHUNK_SIZE', '2000'))
+ORDER_BULK_MAX_ITEMS = int(os.environ.get('ORDER_BULK_MAX_ITEMS', '1000'))
+ORDER_BULK_BATCH_SIZE = int(os.environ.get('ORDER_BULK_BATCH_SIZE', '500'))
+ORDER_BULK_WRITE_MAX_ITEMS = int(os.environ.get('ORDER_BULK_WRITE_MAX_ITEMS', '10000'))
+IDEMPOTENCY_KEY_TTL = int(os.environ.get('IDEMPOTENCY_KEY_TTL', '86400'))
+SMS_DELIVERY_REPORT_TOKEN = os.environ.get('SMS_DELIVERY_REPORT_TOKEN', '')
+SMS_DELIVERY_REPORT_STORE_UNKNOWN = os.environ.get('SMS_DELIVERY_REPORT_STORE_UNKNOWN', 'False') == 'True'
+SMS_DELIVERY_REPORT_BATCH_SIZE = int(os.environ.get('SMS_DELIVERY_REPORT_BATCH_SIZE', '500'))
+SMS_DELIVERY_REPORT_FLUSH_INTERVAL = float(os.environ.get('SMS_DELIVERY_REPORT_FLUSH_INTERVAL', '2'))
+SMS_BREAKER_FAILURE_RATE = float(os.environ.get('SMS_BREAKER_FAILURE_RATE', '0.5'))
+SMS_BREAKER_MIN_CALLS = int(os.environ.get('SMS_BREAKER_MIN_CALLS', '10'))
+SMS_BREAKER_WINDOW = int(os.environ.get('SMS_BREAKER_WINDOW', '20'))
+SMS_BREAKER_RESET_TIMEOUT = int(os.environ.get('SMS_BREAKER_RESET_TIMEOUT', '30'))
+SMS_BREAKER_HALF_OPEN_CALLS = int(os.environ.get('SMS_BREAKER_HALF_OPEN_CALLS', '1'))
+SMS_OUTBOX_BATCH_SIZE = int(os.environ.get('SMS_OUTBOX_BATCH_SIZE', '100'))
+SMS_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('SMS_OUTBOX_MAX_ATTEMPTS', '5'))
+SMS_OUTBOX_RETRY_DELAY = int(os.environ.get('SMS_OUTBOX_RETRY_DELAY', '30'))
+SMS_OUTBOX_LEASE_SECONDS = int(os.environ.get('SMS_OUTBOX_LEASE_SECONDS', '300'))
+SMS_DISPATCH_WORKERS = int(os.environ.get('SMS_DISPATCH_WORKERS', '8'))
+SMS_DISPATCH_RATE = float(os.environ.get('SMS_DISPATCH_RATE', '50'))
+SMS_DISPATCH_BURST = int(os.environ.get('SMS_DISPATCH_BURST', '50'))
 USE_TOKEN_MIDDLEWARE = os.environ.get('USE_TOKEN_MIDDLEWARE', 'False').lower() == 'true'
+AUTH0_TOKEN_STORE = os.environ.get('AUTH0_TOKEN_STORE', 'sms_service.token_store.LocalTokenStore')
+AUTH0_TOKEN_STORE_PATH = os.environ.get('AUTH0_TOKEN_STORE_PATH', '/tmp/sms_service_auth0_token.json')
+AUTH0_TOKEN_STORE_CACHE = os.environ.get('AUTH0_TOKEN_STORE_CACHE', 'default')
+AUTH0_TOKEN_LOCK_TIMEOUT = int(os.environ.get('AUTH0_TOKEN_LOCK_TIMEOUT', '15'))
+AUTH0_TOKEN_BACKGROUND_REFRESH = os.environ.get('AUTH0_TOKEN_BACKGROUND_REFRESH', 'True').lower() == 'true'
+AUTH0_TOKEN_REFRESH_FRACTION = float(os.environ.get('AUTH0_TOKEN_REFRESH_FRACTION', '0.8'))
+AUTH0_TOKEN_REFRESH_RETRY_BASE = float(os.environ.get('AUTH0_TOKEN_REFRESH_RETRY_BASE', '1'))
+AUTH0_TOKEN_REFRESH_RETRY_MAX = float(os.environ.get('AUTH0_TOKEN_REFRESH_RETRY_MAX', '60'))
 
 
 MIDDLEWARE = [
@@ -124,6 +168,23 @@ DATABASES = {
         'PORT': os.environ.get('DB_PORT', '5432'),
     }
 }
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'sms_service.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+OBJECT_CACHE_ALIAS = os.environ.get('OBJECT_CACHE_ALIAS', 'default')
+OBJECT_CACHE_TIMEOUT = int(os.environ.get('OBJECT_CACHE_TIMEOUT', '300'))
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
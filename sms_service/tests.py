@@ -1,14 +1,22 @@
 from django.test import TestCase, Client
 from django.urls import reverse
+from django.http import JsonResponse
 from unittest.mock import patch, MagicMock
 import json
 import requests
 import sys
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
 
 
 class AuthTests(TestCase):
     def setUp(self):
+        from sms_service.auth_middleware import Auth0TokenMiddleware
+        from sms_service.token_store import get_token_store
+
         self.client = Client()
+        get_token_store().clear()
+        Auth0TokenMiddleware._token = None
+        Auth0TokenMiddleware._token_expiry = 0
     
     def test_is_test_environment(self):
         from sms_service.auth import is_test_environment
@@ -39,7 +47,7 @@ class AuthTests(TestCase):
         token = get_token_auth_header(request)
         self.assertIsNone(token)
     
-    @patch('requests.post')
+    @patch('sms_service.auth0_client.post')
     def test_token_generation(self, mock_post):
         mock_response = MagicMock()
         mock_response.json.return_value = {
@@ -55,7 +63,7 @@ class AuthTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(json.loads(response.content)['access_token'], 'test-token')
     
-    @patch('requests.post')
+    @patch('sms_service.auth0_client.post')
     def test_token_generation_error(self, mock_post):
         mock_post.side_effect = requests.exceptions.ConnectionError("Connection refused")
         
@@ -64,6 +72,44 @@ class AuthTests(TestCase):
         self.assertEqual(response.status_code, 500)
         self.assertEqual(json.loads(response.content)['error'], 'Connection refused')
     
+    @patch('sms_service.auth0_client.post')
+    def test_token_generation_is_cached(self, mock_post):
+        mock_response = MagicMock()
+        mock_response.json.return_value = {'access_token': 'test-token', 'expires_in': 86400}
+        mock_post.return_value = mock_response
+        
+        first = json.loads(self.client.post(reverse('generate-token')).content)
+        second = self.client.post(reverse('generate-token'))
+        
+        mock_post.assert_called_once()
+        self.assertEqual(json.loads(second.content)['access_token'], 'test-token')
+        self.assertLessEqual(json.loads(second.content)['expires_in'], first['expires_in'])
+        self.assertGreater(json.loads(second.content)['expires_in'], 86000)
+        self.assertEqual(second['Cache-Control'], 'no-store')
+    
+    def test_token_generation_coalesces_concurrent_callers(self):
+        from sms_service.auth_middleware import Auth0TokenMiddleware
+        import threading
+        import time
+        
+        def slow_fetch():
+            time.sleep(0.2)
+            return {'access_token': 'coalesced-token', 'expires_in': 3600}
+        
+        results = []
+        with patch.object(Auth0TokenMiddleware, '_fetch_new_token', side_effect=slow_fetch) as mock_fetch:
+            threads = [
+                threading.Thread(target=lambda: results.append(Auth0TokenMiddleware.get_token_data()['access_token']))
+                for _ in range(5)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+        
+        mock_fetch.assert_called_once()
+        self.assertEqual(results, ['coalesced-token'] * 5)
+    
     @patch('sms_service.auth_middleware.Auth0TokenMiddleware._get_valid_token')
     def test_middleware_adds_token(self, mock_get_token):
         mock_get_token.return_value = 'middleware-token'
@@ -122,4 +168,360 @@ class AuthTests(TestCase):
             token = Auth0TokenMiddleware._get_valid_token()
             
             self.assertEqual(token, "new-refreshed-token")
-            mock_fetch.assert_called_once()        
\ No newline at end of file
+            mock_fetch.assert_called_once()        
+
+class JWKSCacheTests(TestCase):
+    TEST_N = "0vx7agoebGcQSuuPiLJXZptN9nndrQmbXEps2aiAFbWhM78LhWx4cbbfAAtVT86zwu1RK7aPFFxuhDR1L6tSoc_BJECPebWKRXjBZCiFV4n3oknjhMstn64tZ_2W-5JsGY4Hc5n9yBXArwl93lqt7_RN5w6Cf0h4QyQ5v-65YGjQR0_FDW2QvzqY368QQMicAtaSqzs8KJZgnYb9c7d0zgdAZHzu6qMQvRL5hajrn1n91CbOpbISD08qNLyrdkt-bFTWhAI4vMQFh6WeZu0fM4lFd2NcRwr3XPksINHaQ-G_xBniIqbw0Ls1jF44-csFCur-kEgU8awapJzKnqDKgw"
+
+    def setUp(self):
+        from sms_service.jwks import JWKSCache
+        self.cache = JWKSCache()
+
+    def _jwks_response(self, kids, cache_control=''):
+        response = MagicMock()
+        response.json.return_value = {'keys': [{'kid': kid, 'kty': 'RSA', 'n': self.TEST_N, 'e': 'AQAB'} for kid in kids]}
+        response.headers = {'Cache-Control': cache_control}
+        return response
+
+    @patch('sms_service.auth0_client.get')
+    def test_keys_are_cached(self, mock_get):
+        mock_get.return_value = self._jwks_response(['key-1'])
+
+        key = self.cache.get_key('key-1')
+        self.assertIsInstance(key, RSAPublicKey)
+        self.assertIs(self.cache.get_key('key-1'), key)
+
+        mock_get.assert_called_once()
+
+    @patch('sms_service.auth0_client.get')
+    def test_unknown_kid_refetches(self, mock_get):
+        mock_get.return_value = self._jwks_response(['key-1'])
+        self.cache.get_key('key-1')
+
+        mock_get.return_value = self._jwks_response(['key-1', 'key-2'])
+        with self.settings(AUTH0_JWKS_MIN_REFRESH_INTERVAL=0):
+            self.assertIsNotNone(self.cache.get_key('key-2'))
+
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('sms_service.auth0_client.get')
+    def test_unknown_kid_refetch_is_throttled(self, mock_get):
+        mock_get.return_value = self._jwks_response(['key-1'])
+        self.cache.get_key('key-1')
+
+        self.assertIsNone(self.cache.get_key('bogus-kid'))
+        mock_get.assert_called_once()
+
+    @patch('sms_service.auth0_client.get')
+    def test_stale_keys_served_when_auth0_unreachable(self, mock_get):
+        mock_get.return_value = self._jwks_response(['key-1'], cache_control='max-age=0')
+        self.cache.get_key('key-1')
+        self.cache._expires_at = 0
+
+        mock_get.side_effect = requests.exceptions.ConnectionError("Connection refused")
+        self.assertIsNotNone(self.cache.get_key('key-1'))
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_registry_skips_unusable_keys(self):
+        from sms_service.jwks import build_key_registry
+
+        registry = build_key_registry({'keys': [
+            {'kid': 'rsa', 'kty': 'RSA', 'n': self.TEST_N, 'e': 'AQAB'},
+            {'kid': 'ec', 'kty': 'EC', 'crv': 'P-256', 'x': 'abc', 'y': 'def'},
+        ]})
+
+        self.assertEqual(list(registry), ['rsa'])
+
+
+class VerifiedTokenCacheTests(TestCase):
+    def setUp(self):
+        import jwt
+        import time
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        from sms_service.jwks import jwks_cache
+        from sms_service.token_cache import verified_tokens
+
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        jwks_cache._keys = {'key-1': self.private_key.public_key()}
+        jwks_cache._expires_at = time.time() + 600
+        verified_tokens.clear()
+        self.addCleanup(jwks_cache.clear)
+        self.addCleanup(verified_tokens.clear)
+
+        with self.settings(AUTH0_DOMAIN='test.auth0.com', API_IDENTIFIER='test_identifier'):
+            self.token = jwt.encode(
+                {'aud': 'test_identifier', 'iss': 'https://test.auth0.com/', 'exp': int(time.time()) + 3600},
+                self.private_key,
+                algorithm='RS256',
+                headers={'kid': 'key-1'},
+            )
+
+    def _call_protected_view(self):
+        from sms_service.auth import requires_auth
+
+        view = requires_auth(lambda request: JsonResponse({'ok': True}))
+        request = self.client.request().wsgi_request
+        request.META['HTTP_AUTHORIZATION'] = f'Bearer {self.token}'
+        with patch('sms_service.auth.is_test_environment', return_value=False), \
+                self.settings(AUTH0_DOMAIN='test.auth0.com', API_IDENTIFIER='test_identifier'):
+            return view(request)
+
+    def test_repeated_token_is_verified_once(self):
+        import jwt
+
+        with patch('sms_service.auth.jwt.decode', wraps=jwt.decode) as mock_decode:
+            self.assertEqual(self._call_protected_view().status_code, 200)
+            self.assertEqual(self._call_protected_view().status_code, 200)
+
+        mock_decode.assert_called_once()
+
+    def test_lru_eviction(self):
+        from sms_service.token_cache import VerifiedTokenCache
+        import time
+
+        cache = VerifiedTokenCache(max_size=2)
+        payload = {'exp': time.time() + 60}
+        for token in ['a', 'b', 'c']:
+            cache.set(token, payload, 'key-1')
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('c'), payload)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_rotated_key_invalidates_cached_tokens(self):
+        from sms_service.jwks import jwks_cache
+        from sms_service.token_cache import verified_tokens
+
+        self.assertEqual(self._call_protected_view().status_code, 200)
+
+        response = MagicMock()
+        response.json.return_value = {'keys': []}
+        response.headers = {}
+        jwks_cache._expires_at = 0
+        with patch('sms_service.auth0_client.get', return_value=response):
+            self.assertEqual(self._call_protected_view().status_code, 401)
+
+        self.assertEqual(verified_tokens.stats()['size'], 0)
+
+
+class Auth0ClientTests(TestCase):
+    def setUp(self):
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            delay = 0
+
+            def do_GET(self):
+                import time
+                time.sleep(self.delay)
+                body = b'{"keys": []}'
+                try:
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except BrokenPipeError:
+                    # The client gave up waiting, which is what the timeout test wants
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.handler = Handler
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def test_connections_are_reused(self):
+        from sms_service import auth0_client
+
+        before = auth0_client.stats()
+        for _ in range(3):
+            self.assertEqual(auth0_client.get(self.url).json(), {'keys': []})
+        after = auth0_client.stats()
+
+        self.assertEqual(after['requests'] - before['requests'], 3)
+        self.assertEqual(after['connections_opened'] - before['connections_opened'], 1)
+
+    def test_hung_connection_times_out(self):
+        from sms_service import auth0_client
+
+        self.handler.delay = 1
+        with self.settings(AUTH0_HTTP_READ_TIMEOUT=0.1):
+            with self.assertRaises(requests.exceptions.ReadTimeout):
+                auth0_client.get(self.url)
+
+
+class TokenStoreTests(TestCase):
+    def setUp(self):
+        import tempfile
+        from sms_service.auth_middleware import Auth0TokenMiddleware
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        Auth0TokenMiddleware._token = None
+        Auth0TokenMiddleware._token_expiry = 0
+
+    def test_file_token_store_round_trip(self):
+        from sms_service.token_store import FileTokenStore
+        import os
+        import stat
+        import time
+
+        store = FileTokenStore(os.path.join(self.tmpdir.name, 'token.json'))
+        self.assertIsNone(store.get())
+
+        with store.lock():
+            store.set({'access_token': 'shared-token', 'expires_at': time.time() + 3600})
+
+        self.assertEqual(store.get()['access_token'], 'shared-token')
+        self.assertEqual(stat.S_IMODE(os.stat(store.path).st_mode), 0o600)
+
+        store.clear()
+        self.assertIsNone(store.get())
+
+    def test_middleware_reuses_token_from_shared_store(self):
+        from sms_service.auth_middleware import Auth0TokenMiddleware
+        from sms_service.token_store import FileTokenStore
+        import os
+        import time
+
+        store = FileTokenStore(os.path.join(self.tmpdir.name, 'token.json'))
+        store.set({'access_token': 'other-worker-token', 'expires_at': time.time() + 3600})
+
+        with patch('sms_service.auth_middleware.get_token_store', return_value=store), \
+                patch.object(Auth0TokenMiddleware, '_fetch_new_token') as mock_fetch:
+            token = Auth0TokenMiddleware._get_valid_token()
+
+        self.assertEqual(token, 'other-worker-token')
+        mock_fetch.assert_not_called()
+
+    def test_middleware_publishes_refreshed_token(self):
+        from sms_service.auth_middleware import Auth0TokenMiddleware
+        from sms_service.token_store import CacheTokenStore
+
+        store = CacheTokenStore()
+        store.clear()
+        self.addCleanup(store.clear)
+
+        with patch('sms_service.auth_middleware.get_token_store', return_value=store), \
+                patch.object(Auth0TokenMiddleware, '_fetch_new_token') as mock_fetch:
+            mock_fetch.return_value = {"access_token": "fresh-token", "expires_in": 3600}
+            token = Auth0TokenMiddleware._get_valid_token()
+
+        self.assertEqual(token, 'fresh-token')
+        self.assertEqual(store.get()['access_token'], 'fresh-token')
+        self.assertIsNone(store.cache.get(store.lock_key))
+
+
+class TokenRefresherTests(TestCase):
+    def setUp(self):
+        from sms_service.auth_middleware import Auth0TokenMiddleware
+        from sms_service.token_store import get_token_store
+        import time
+
+        self.store = get_token_store()
+        self.store.clear()
+        self.addCleanup(self.store.clear)
+        Auth0TokenMiddleware._set_token({
+            'access_token': 'current-token',
+            'expires_at': time.time() + 600,
+            'refresh_at': time.time() - 1,
+        })
+
+    def test_requests_do_not_wait_for_background_refresh(self):
+        from sms_service.auth_middleware import Auth0TokenMiddleware
+        import threading
+
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_fetch():
+            started.set()
+            release.wait(5)
+            return {'access_token': 'renewed-token', 'expires_in': 3600}
+
+        with patch.object(Auth0TokenMiddleware, '_fetch_new_token', side_effect=slow_fetch):
+            refresher = threading.Thread(target=Auth0TokenMiddleware._refresh_in_background)
+            refresher.start()
+            self.assertTrue(started.wait(5))
+
+            self.assertEqual(Auth0TokenMiddleware._get_valid_token(), 'current-token')
+
+            release.set()
+            refresher.join(5)
+
+        self.assertEqual(Auth0TokenMiddleware._get_valid_token(), 'renewed-token')
+        self.assertEqual(self.store.get()['access_token'], 'renewed-token')
+
+    def test_background_refresh_adopts_token_renewed_elsewhere(self):
+        from sms_service.auth_middleware import Auth0TokenMiddleware
+        import time
+
+        self.store.set({
+            'access_token': 'other-worker-token',
+            'expires_at': time.time() + 3600,
+            'refresh_at': time.time() + 2880,
+        })
+
+        with patch.object(Auth0TokenMiddleware, '_fetch_new_token') as mock_fetch:
+            self.assertTrue(Auth0TokenMiddleware._refresh_in_background())
+
+        mock_fetch.assert_not_called()
+        self.assertEqual(Auth0TokenMiddleware._get_valid_token(), 'other-worker-token')
+
+    def test_failed_refresh_backs_off_with_jitter(self):
+        from sms_service.auth_middleware import Auth0TokenMiddleware
+
+        with patch.object(Auth0TokenMiddleware, '_fetch_new_token', return_value=None):
+            self.assertFalse(Auth0TokenMiddleware._refresh_in_background())
+
+        with self.settings(AUTH0_TOKEN_REFRESH_RETRY_BASE=1, AUTH0_TOKEN_REFRESH_RETRY_MAX=10):
+            delays = [Auth0TokenMiddleware._retry_delay(failures) for failures in range(1, 8)]
+
+        self.assertTrue(all(0 <= delay <= 10 for delay in delays))
+        self.assertEqual(Auth0TokenMiddleware._get_valid_token(), 'current-token')
+
+
+class SerializationTests(TestCase):
+    def test_dumps_matches_previous_wire_format(self):
+        from datetime import datetime, timezone
+        from decimal import Decimal
+        from sms_service.serialization import dumps
+
+        when = datetime(2024, 5, 1, 8, 30, 15, 123456, tzinfo=timezone.utc)
+        data = {'amount': Decimal('1234.50'), 'order_time': when, 'name': 'Zawadi'}
+
+        self.assertEqual(
+            json.loads(dumps(data)),
+            {'amount': '1234.50', 'order_time': when.isoformat(), 'name': 'Zawadi'}
+        )
+
+    def test_row_serializer(self):
+        from customers.models import Customer
+        from sms_service.serialization import RowSerializer
+
+        customer = Customer.objects.create(name="Row", code="ROW1", phone="0712345678", email="r@example.com")
+        serializer = RowSerializer(id='id', name='name', phone='phone_e164')
+
+        with self.assertNumQueries(1):
+            rows = serializer.rows(Customer.objects.all())
+        self.assertEqual(rows, [{'id': customer.id, 'name': "Row", 'phone': "+254712345678"}])
+        self.assertEqual(serializer.instance(customer), rows[0])
+        self.assertIsNone(serializer.one(Customer.objects.filter(id=0)))
+
+    def test_renderer_is_used_by_api_views(self):
+        from customers.models import Customer
+        from sms_service.renderers import ORJSONRenderer
+
+        Customer.objects.create(name="Row", code="ROW1", phone="0712345678", email="r@example.com")
+        response = Client().get(reverse('customer-list'))
+
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.json()[0]['name'], "Row")
@@ -0,0 +1,107 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .jwks import jwks_cache
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of access tokens that already passed verification.
+
+    Entries are keyed on a SHA-256 digest of the token, hold the decoded
+    payload until the token's exp, and are dropped as soon as the key
+    that signed them disappears from the JWKS.
+    """
+
+    def __init__(self, max_size=None):
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def max_size(self):
+        if self._max_size is not None:
+            return self._max_size
+        return settings.AUTH0_VERIFIED_TOKEN_CACHE_SIZE
+
+    @staticmethod
+    def _digest(token):
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token):
+        """Return the cached payload for token, or None if it must be verified."""
+        digest = self._digest(token)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            payload, expires_at, kid = entry
+            if time.time() >= expires_at:
+                del self._entries[digest]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(digest)
+
+        # Also lets the JWKS cache revalidate, so rotations are noticed
+        if jwks_cache.get_key(kid) is None:
+            self.invalidate_kids([kid])
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return payload
+
+    def set(self, token, payload, kid):
+        """Remember a verified token until it expires."""
+        expires_at = payload.get('exp')
+        if not expires_at or self.max_size <= 0:
+            return
+
+        digest = self._digest(token)
+        with self._lock:
+            self._entries[digest] = (payload, expires_at, kid)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_kids(self, kids):
+        """Drop every token signed with one of the given key ids."""
+        kids = set(kids)
+        with self._lock:
+            stale = [digest for digest, entry in self._entries.items() if entry[2] in kids]
+            for digest in stale:
+                del self._entries[digest]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+verified_tokens = VerifiedTokenCache()
+jwks_cache.add_rotation_listener(verified_tokens.invalidate_kids)
@@ -1,25 +1,26 @@
-import requests
-from django.conf import settings
+import time
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
+from .auth_middleware import Auth0TokenMiddleware
 
 @csrf_exempt
 def generate_token(request):
-    
-    url = f"https://{settings.AUTH0_DOMAIN}/oauth/token"
-    
-    payload = {
-        "client_id": settings.OIDC_RP_CLIENT_ID,
-        "client_secret": settings.OIDC_RP_CLIENT_SECRET,
-        "audience": settings.API_IDENTIFIER,
-        "grant_type": "client_credentials"
-    }
-    
-    headers = {"content-type": "application/json"}
-    
+    """
+    Hand out the service's client-credentials token.
+
+    The token is shared with Auth0TokenMiddleware, so callers get the
+    cached token until it nears expiry instead of a new Auth0 round-trip
+    per call, with expires_in set to its remaining lifetime.
+    """
     try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        return JsonResponse(response.json())
+        token_data = Auth0TokenMiddleware.get_token_data()
     except Exception as e:
-        return JsonResponse({"error": str(e)}, status=500)
\ No newline at end of file
+        return JsonResponse({"error": str(e)}, status=500)
+    
+    response = JsonResponse({
+        "access_token": token_data['access_token'],
+        "expires_in": max(int(token_data['expires_at'] - time.time()), 0),
+        "token_type": "Bearer"
+    })
+    response['Cache-Control'] = 'no-store'
+    return response
@@ -0,0 +1,150 @@
+import fcntl
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+
+class TokenStore:
+    """
+    Where Auth0TokenMiddleware keeps its client-credentials token.
+
+    get() returns a dict with at least access_token and expires_at (or
+    None), set() replaces it, and lock() guards a refresh so only one
+    holder fetches a new token at a time.
+    """
+
+    def get(self):
+        raise NotImplementedError
+
+    def set(self, token_data):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def lock(self):
+        raise NotImplementedError
+
+
+class LocalTokenStore(TokenStore):
+    """Per-process store; every worker fetches its own token."""
+
+    def __init__(self):
+        self._token_data = None
+        self._lock = threading.RLock()
+
+    def get(self):
+        return self._token_data
+
+    def set(self, token_data):
+        self._token_data = token_data
+
+    def clear(self):
+        self._token_data = None
+
+    def lock(self):
+        return self._lock
+
+
+class FileTokenStore(TokenStore):
+    """
+    Store shared by every worker on a node through a JSON file.
+
+    Refreshes are serialized with an flock on a sibling lock file, which
+    the kernel releases if the holder dies.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or settings.AUTH0_TOKEN_STORE_PATH
+        self.lock_path = f"{self.path}.lock"
+
+    def get(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, token_data):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(token_data, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def lock(self):
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+
+class CacheTokenStore(TokenStore):
+    """
+    Store kept in a Django cache shared by the workers (e.g. Redis).
+
+    The refresh lock is a cache.add() key with a timeout, so a crashed
+    holder cannot block refreshes for longer than AUTH0_TOKEN_LOCK_TIMEOUT.
+    """
+
+    key = 'auth0:m2m-token'
+    lock_key = 'auth0:m2m-token:lock'
+
+    def __init__(self, alias=None):
+        self.cache = caches[alias or settings.AUTH0_TOKEN_STORE_CACHE]
+
+    def get(self):
+        return self.cache.get(self.key)
+
+    def set(self, token_data):
+        timeout = max(int(token_data['expires_at'] - time.time()), 1)
+        self.cache.set(self.key, token_data, timeout)
+
+    def clear(self):
+        self.cache.delete(self.key)
+
+    @contextmanager
+    def lock(self):
+        lock_timeout = settings.AUTH0_TOKEN_LOCK_TIMEOUT
+        deadline = time.time() + lock_timeout
+        acquired = self.cache.add(self.lock_key, os.getpid(), lock_timeout)
+        while not acquired and time.time() < deadline:
+            time.sleep(0.05)
+            acquired = self.cache.add(self.lock_key, os.getpid(), lock_timeout)
+        try:
+            # If the holder never released the lock we go ahead anyway;
+            # callers re-check the store before fetching
+            yield
+        finally:
+            if acquired:
+                self.cache.delete(self.lock_key)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_token_store():
+    """Return the store configured by AUTH0_TOKEN_STORE."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = import_string(settings.AUTH0_TOKEN_STORE)()
+    return _store
@@ -17,6 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from .token_generator import generate_token
+from .views import cache_status
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
@@ -42,6 +43,7 @@ urlpatterns = [
     path('api/orders/', include('orders.urls')),
     path('oidc/', include('mozilla_django_oidc.urls')),
     path('api/generate-token/', generate_token, name='generate-token'),
+    path('api/cache/stats/', cache_status, name='cache-stats'),
     path('', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
 ]
\ No newline at end of file
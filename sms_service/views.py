@@ -0,0 +1,35 @@
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from .auth import requires_auth
+from .object_cache import cache_stats
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_description="Hit and miss counters of the object caches in this worker process",
+    responses={
+        200: openapi.Response(
+            description="Successful operation",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                additional_properties=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'hits': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'misses': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'invalidations': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'hit_ratio': openapi.Schema(type=openapi.TYPE_NUMBER),
+                    }
+                )
+            )
+        ),
+        401: openapi.Response(description="Unauthorized")
+    }
+)
+@api_view(['GET'])
+@requires_auth
+def cache_status(request):
+    return Response(cache_stats())